@@ -1,14 +1,38 @@
-import logging
+from src import startup  # noqa: F401, first so startup timings are relative to the launch
 
-from src.context import Context
+import argparse
+import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s:%(levelname)s:%(name)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bot playing 10,000,000.")
+    parser.add_argument("--headless", action="store_true", help="run without overlay, serving the bot status on a local HTTP port instead")
+    parser.add_argument("--port", type=int, help="local HTTP port of the headless status, 0 to pick any free port")
+    parser.add_argument("--multi-window", action="store_true", help="play every opened game window, each in its own bot thread")
+    arguments = parser.parse_args()
+
+    if arguments.multi_window:
+        from src import properties
+
+        properties.MULTI_WINDOW_ENABLED = True
+
+    if arguments.port is not None:
+        from src import properties
+
+        properties.STATUS_SERVER_PORT = arguments.port
+
     try:
         logger.info("Loading 10,000,000.")
-        Context().start()
+        if arguments.headless:
+            from src.headless_context import HeadlessContext
+
+            HeadlessContext().start()
+        else:
+            from src.context import Context
+
+            Context().start()
     except Exception as e:
         logger.exception(e)
     finally:
@@ -1,55 +1,225 @@
 import logging
-from time import sleep
+from functools import singledispatch
+from queue import SimpleQueue
+from threading import Thread
+from time import sleep, perf_counter, time
+from typing import List, Callable, Tuple
 
-from src import properties
+from src import properties, startup
+from src.command import Command, SetProperty, Stop
+from src.domain.board_tracker import BoardTracker
 from src.domain.game_state import GameState
-from src.infra.pyautogui_impl import do_move, detect_game_state
+from src.domain.grid import Grid
+from src.domain.lookahead import Planner
+from src.domain.move_index import MoveIndex
+from src.domain.move_verification import MoveOutcome, find_verified_step
+from src.domain.objective import Move
+from src.domain.refill import RefillModel
+from src.domain.run import RunLifecycle, GameScreen
+from src.domain.scoring_profile import DEFAULT_SCORING_PROFILES
+from src.idle_governor import IdleGovernor
+from src.infra.process_pool_planner import ProcessPoolPlanner
+from src.infra.scoring_profiles_loader import load_scoring_profiles
+from src.snapshot import SnapshotChannel
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 # TODO backlog
-# If last move was item move, don't screenshot before next move
-# Auto replay
+# Auto replay, needs anchors of the end-of-run and menu screens
 # Add items in UI
-# Give proper value to scrolls
 # Handle status effects
-# Adjust value per tile type per quest
 # Lower shield value if max shield
 # Move with 5+ key should have less value than 4 but more than 3
 
+COMMAND_POLLING_SECONDS = 0.1
+
+# Only read and written by the bot thread. Other threads send commands instead.
 running = True
 
-game_state = GameState()
+channel = SnapshotChannel()
+commands: SimpleQueue[Command] = SimpleQueue()
+
+scoring_profiles = DEFAULT_SCORING_PROFILES
+
+
+class BotInstance:
+    """
+    Plays one game window, with its own capture context and game state.
+    Instances of several windows detect and plan in parallel, while their mouse actions are serialized by the detection module.
+    """
+
+    def __init__(self, capture_context=None, instance_channel: SnapshotChannel | None = None) -> None:
+        self.capture_context = capture_context
+        self.channel = instance_channel if instance_channel is not None else SnapshotChannel()
+        self.board_tracker = BoardTracker()
+        self.refill_model = RefillModel()
+        self.move_index = MoveIndex()
+        self.idle_governor = IdleGovernor()
+        self.run_lifecycle = RunLifecycle()
+        self.move_duration = 0
+
+    def play(self, detection, planner: Planner | None) -> float:
+        """Detect, plan and move once. Returns how long to wait before the next detection."""
+        if self.idle_governor.idle:
+            probes = detection.sample_probes(self.capture_context)
+            if not self.idle_governor.should_detect(probes):
+                return self.idle_governor.wait(probes)
+
+        detection_start = perf_counter()
+        detected_game_state = self.board_tracker.track(detection.detect_game_state(self.capture_context))
+        startup.mark("first detection")
+        logger.info(f"GameState updated. {len(detected_game_state.grid)} tiles. Objective: {detected_game_state.objective.type}.")
+
+        planning_start = perf_counter()
+        self.refill_model.observe(detected_game_state.grid)
+        packed_move = detected_game_state.select_best_move(self.refill_model, scoring_profiles, self.move_index, planner)
+        planning_end = perf_counter()
+
+        timings = {"detection": planning_start - detection_start, "planning": planning_end - planning_start, "last_move": self.move_duration}
+        self.channel.publish(detected_game_state, packed_move, timings)
+        best_move = packed_move[0] if packed_move is not None else None
+
+        if best_move is None:
+            move_delay = self._wait_for_next_move(detection, detected_game_state)
+        elif properties.MOVEMENT_ENABLED:
+            self.run_lifecycle.observe(GameScreen.GAME, time())
+            self.idle_governor.wake()
+            move_delay, outcome = self._move(detection, detected_game_state.grid, best_move)
+            if outcome is not MoveOutcome.MISSED:
+                self.run_lifecycle.record_move()
+                self.board_tracker.expect(detected_game_state.grid, best_move)
+            if "first move" not in startup.stage_times:
+                startup.mark("first move")
+                startup.report()
+        else:
+            move_delay = 0
+        self.move_duration = perf_counter() - planning_end
+
+        return move_delay
+
+    def _move(self, detection, grid: Grid, move: Move) -> Tuple[float, MoveOutcome]:
+        """
+        The tile step of a move is verified once done. When it missed, it is played again right away, the board did not change.
+        When it landed, the board only needs a short while to settle.
+        """
+        move_delay = detection.do_move(move, self.capture_context)
+        verified_step = find_verified_step(move, grid) if properties.MOVE_VERIFICATION_ENABLED else None
+        if verified_step is None:
+            return move_delay, MoveOutcome.UNKNOWN
+
+        tile_move, step_grid = verified_step
+        for retry in range(properties.MOVE_RETRIES + 1):
+            if retry > 0:
+                move_delay = detection.do_move(tile_move, self.capture_context)
+            verification_start = perf_counter()
+            outcome = detection.verify_move(step_grid, tile_move, self.capture_context)
+            if outcome is MoveOutcome.UNKNOWN:
+                return move_delay, outcome
+            if outcome is not MoveOutcome.MISSED:
+                settle_delay = min(move_delay, properties.VERIFIED_MOVE_SETTLE_SECONDS)
+                return max(0.0, settle_delay - (perf_counter() - verification_start)), outcome
+            logger.warning(f"Move {tile_move} missed.")
+
+        # Detected again without waiting, since nothing moved
+        return 0, MoveOutcome.MISSED
+
+    def _wait_for_next_move(self, detection, game_state: GameState) -> float:
+        """Idles until the screen changes. A full board without move is still a game screen."""
+        if len(game_state.grid) >= properties.MIN_TILE_THRESHOLD:
+            self.run_lifecycle.observe(GameScreen.GAME, time())
+
+        # Probes are sampled after detection, so whatever changes from now on wakes the bot up
+        return self.idle_governor.wait(detection.sample_probes(self.capture_context))
+
+
+# Every played game window. The first one publishes to the main channel.
+instances: List[BotInstance] = [BotInstance(instance_channel=channel)]
 
 
 def fetch_game_state() -> GameState:
-    global game_state
-    return game_state
+    return channel.latest().game_state
 
 
-def main_loop() -> None:
+def send_command(command: Command) -> None:
+    commands.put(command)
+
+
+def execute_pending_commands() -> None:
+    while not commands.empty():
+        command = commands.get_nowait()
+        logger.debug(f"Executing {command}.")
+        execute(command)
+
+
+@singledispatch
+def execute(command: Command) -> None:
+    raise NotImplementedError(f"No implementation for {type(command)}")
+
+
+@execute.register
+def _(command: SetProperty) -> None:
+    setattr(properties, command.name, command.value)
+
+
+@execute.register
+def _(command: Stop) -> None:
     global running
-    global game_state
+    running = False
 
-    logger.info("Bot is running.")
-    try:
-        while running:
-            logger.info("Updating game state.")
 
-            game_state = detect_game_state()
-            logger.info(f"GameState updated. {len(game_state.grid)} tiles. Objective: {game_state.objective.type}.")
+def main_loop() -> None:
+    global scoring_profiles, instances
 
-            best_move = game_state.select_best_move()
+    scoring_profiles = load_scoring_profiles(properties.SCORING_PROFILES_PATH, properties.QUEST)
+    # Detection is only imported here, so the UI and the status server never wait on its heavy dependencies
+    detection = startup.prepare_detection().result()
+    planner = (
+        ProcessPoolPlanner(properties.LOOKAHEAD_DEPTH, properties.LOOKAHEAD_DEADLINE_SECONDS, properties.LOOKAHEAD_WORKERS)
+        if properties.LOOKAHEAD_DEPTH > 0
+        else None
+    )
 
-            if properties.MOVEMENT_ENABLED and best_move is not None:
-                move_delay = do_move(best_move)
-            else:
-                move_delay = 0
+    if properties.MULTI_WINDOW_ENABLED:
+        capture_contexts = detection.discover_game_windows()
+        if capture_contexts:
+            instances = [BotInstance(capture_context, channel if i == 0 else None) for i, capture_context in enumerate(capture_contexts)]
 
-            sleep(move_delay)
+    logger.info(f"Bot is running on {len(instances)} game windows.")
+    try:
+        execute_pending_commands()
+        if len(instances) == 1:
+            _play_until_stopped(instances[0], detection, planner, execute_pending_commands)
+        else:
+            # Templates and planner processes are shared, each game window only costs a thread
+            threads = [Thread(target=_play_until_stopped, args=(instance, detection, planner), daemon=True) for instance in instances]
+            for thread in threads:
+                thread.start()
+            while running and any(thread.is_alive() for thread in threads):
+                sleep(COMMAND_POLLING_SECONDS)
+                execute_pending_commands()
+            for thread in threads:
+                thread.join()
     except Exception as e:
         logger.exception(e)
         raise e
     finally:
+        if planner is not None:
+            planner.shutdown()
+        detection.save_cell_cache()
         logger.info("Bot is stopped.")
+
+
+def _play_until_stopped(instance: BotInstance, detection, planner: Planner | None, between_moves: Callable[[], None] = lambda: None) -> None:
+    try:
+        while running:
+            logger.info("Updating game state.")
+            end_of_delay = perf_counter() + instance.play(detection, planner)
+            between_moves()
+            # Idle delays last seconds, commands are still executed meanwhile
+            while running and perf_counter() < end_of_delay:
+                sleep(max(0.0, min(COMMAND_POLLING_SECONDS, end_of_delay - perf_counter())))
+                between_moves()
+    except Exception as e:
+        logger.exception(e)
+        raise e
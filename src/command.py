@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+class Command:
+    pass
+
+
+@dataclass(frozen=True)
+class SetProperty(Command):
+    name: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class Stop(Command):
+    pass
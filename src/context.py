@@ -4,7 +4,8 @@ from threading import Thread
 
 from PyQt6.QtWidgets import QApplication
 
-from src import bot
+from src import bot, startup
+from src.command import Stop
 from src.ui.game_state_observer import GameStateObserver
 from src.ui.overlay import Overlay
 
@@ -14,6 +15,7 @@ logger = logging.getLogger(__name__)
 class Context:
     def __init__(self) -> None:
         logger.info("Initializing context.")
+        startup.prepare_detection()
 
         self.app = QApplication(sys.argv)
 
@@ -24,6 +26,7 @@ class Context:
         self.overlay = Overlay()
         self.overlay.closeEvent = self.stop
         self.game_state_observer = GameStateObserver(self.overlay.on_game_state_change)
+        startup.mark("ui")
 
     def start(self):
         logger.info("Starting context.")
@@ -38,5 +41,5 @@ class Context:
         self.app.exec()
 
     def stop(self):
-        bot.running = False
+        bot.send_command(Stop())
         self.game_state_observer.stop()
@@ -0,0 +1,119 @@
+import logging
+from dataclasses import dataclass, field, replace
+from functools import singledispatch
+from typing import Dict
+
+from src.domain.game_state import GameState
+from src.domain.grid import Grid, EmptyGrid, InconsistentGrid
+from src.domain.item_planner import TILE_TRANSFORMATIONS, simulate_item_use
+from src.domain.objective import Move, TileMove, ItemMove, ChainedMove
+from src.domain.screen import Point
+from src.domain.tile import TileType, board_tile
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Frames an undetected tile is carried over from the known board, before it is considered gone
+MAX_CARRIED_FRAMES = 2
+
+
+@singledispatch
+def predict_grid(move: Move, grid: Grid) -> Grid | None:
+    """Grid expected once the move is done, None when its effect on the board is not known."""
+    return None
+
+
+@predict_grid.register
+def _(move: TileMove, grid: Grid) -> Grid | None:
+    return grid.simulate_line_shift(move.tile_to_move.grid_position, move.grid_destination)[1]
+
+
+@predict_grid.register
+def _(move: ItemMove, grid: Grid) -> Grid | None:
+    return simulate_item_use(grid, move.item)[1] if move.item.type in TILE_TRANSFORMATIONS else None
+
+
+@predict_grid.register
+def _(move: ChainedMove, grid: Grid) -> Grid | None:
+    for chained_move in move.moves:
+        grid = predict_grid(chained_move, grid)
+        if grid is None:
+            return None
+    return grid
+
+
+@dataclass
+class BoardTracker:
+    """
+    Merge each detected grid with the last confirmed one and with the grid predicted after the last move.
+    A detected tile is trusted when it agrees with the confirmed or predicted grid, or when the same change is detected twice in a row.
+    When more than half of the board changed unexpectedly, the board is considered new and the detection is trusted as is.
+    Undetected tiles are carried over from the known board for a few frames only, and only when most of the board was detected.
+    Otherwise, like in the middle of a combo, the detected tiles are returned alone.
+    """
+
+    confirmed_grid: Grid = EmptyGrid()
+    predicted_grid: Grid | None = None
+    pending_types: Dict[Point, TileType] = field(default_factory=dict)
+    carried_frames: Dict[Point, int] = field(default_factory=dict)
+
+    def track(self, game_state: GameState) -> GameState:
+        return replace(game_state, grid=self.track_grid(game_state.grid))
+
+    def track_grid(self, detected_grid: Grid) -> Grid:
+        if not detected_grid.tiles:
+            return detected_grid
+
+        detected_grid = detected_grid.fill_with_unknown()
+        predicted_grid = self.predicted_grid
+        self.predicted_grid = None
+
+        if self.confirmed_grid.size != detected_grid.size or (predicted_grid is not None and predicted_grid.size != detected_grid.size):
+            return self._reset(detected_grid)
+
+        if sum(tile.type == TileType.UNKNOWN for tile in detected_grid) > len(detected_grid) / 2:
+            logger.debug("Most of the board was not detected. Trusting detected tiles only.")
+            # The board is not settled yet, the prediction is kept for when it is
+            self.predicted_grid = predicted_grid
+            self.carried_frames = {}
+            return InconsistentGrid([tile for tile in detected_grid if tile.type != TileType.UNKNOWN], detected_grid.size)
+
+        pending_types = {}
+        carried_frames = {}
+        tiles = []
+        for index, detected_tile in enumerate(detected_grid):
+            confirmed_type = self.confirmed_grid.tiles[index].type
+            expected_type = predicted_grid.tiles[index].type if predicted_grid is not None else confirmed_type
+            position = detected_tile.grid_position
+
+            if detected_tile.type == TileType.UNKNOWN:
+                carried_frames[position] = self.carried_frames.get(position, 0) + 1
+                tiles.append(board_tile(expected_type, position) if carried_frames[position] <= MAX_CARRIED_FRAMES else detected_tile)
+            elif detected_tile.type in {confirmed_type, expected_type} or expected_type == TileType.UNKNOWN:
+                tiles.append(detected_tile)
+            elif self.pending_types.get(position) == detected_tile.type:
+                tiles.append(detected_tile)
+            else:
+                pending_types[position] = detected_tile.type
+                tiles.append(board_tile(expected_type, position))
+
+        if len(pending_types) > len(detected_grid) / 2:
+            return self._reset(detected_grid)
+
+        if pending_types:
+            logger.debug(f"Not trusting changes at {[str(position) for position in pending_types]} until they are detected again.")
+
+        self.pending_types = pending_types
+        self.carried_frames = carried_frames
+        self.confirmed_grid = Grid(tiles, detected_grid.size)
+        return InconsistentGrid([tile for tile in tiles if tile.type != TileType.UNKNOWN], detected_grid.size)
+
+    def expect(self, grid: Grid, move: Move) -> None:
+        self.predicted_grid = predict_grid(move, grid.fill_with_unknown()) if grid.tiles else None
+
+    def _reset(self, detected_grid: Grid) -> Grid:
+        logger.info("Board changed too much to be tracked. Trusting detected grid.")
+        self.pending_types = {}
+        self.carried_frames = {}
+        self.confirmed_grid = detected_grid
+        return InconsistentGrid([tile for tile in detected_grid if tile.type != TileType.UNKNOWN], detected_grid.size)
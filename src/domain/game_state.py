@@ -1,11 +1,17 @@
 import logging
 from dataclasses import dataclass
-from typing import FrozenSet
+from typing import FrozenSet, Tuple
 
 from src import properties
 from src.domain.grid import Grid, EmptyGrid
-from src.domain.item import Item
-from src.domain.objective import Objective, TileMove, create_item_move
+from src.domain.item import Item, ItemType
+from src.domain.item_planner import plan_item_moves
+from src.domain.lookahead import Planner
+from src.domain.move_index import MoveIndex
+from src.domain.objective import Objective, Move, TileMove
+from src.domain.refill import RefillModel
+from src.domain.scoring_profile import ScoringProfiles, DEFAULT_SCORING_PROFILES
+from src.domain.status import Status
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -17,8 +23,14 @@ class GameState:
     objective: Objective = Objective()
     items: FrozenSet[Item] = frozenset()
 
-    def select_best_move(self) -> TileMove | None:
-        possible_moves = self._find_possible_move()
+    def select_best_move(
+        self,
+        refill_model: RefillModel | None = None,
+        scoring_profiles: ScoringProfiles = DEFAULT_SCORING_PROFILES,
+        move_index: MoveIndex | None = None,
+        planner: Planner | None = None,
+    ) -> Tuple[Move, float] | None:
+        possible_moves = self._find_possible_move(refill_model, move_index)
 
         if not possible_moves:
             logger.warning("No moves available.")
@@ -30,20 +42,32 @@ class GameState:
 
         logger.debug(f"Evaluating moves {str_moves[:-1]}")
 
-        packed_move = self.objective.select_best_move(possible_moves)
+        tile_values = scoring_profiles.find_tile_values(self.objective.type, self.find_status())
+        follow_up_scores = None
+        if planner is not None:
+            # Only tile moves have a follow-up, see Planner.evaluate_follow_ups
+            tile_moves = [move for move in possible_moves if isinstance(move, TileMove)]
+            follow_up_scores = planner.evaluate_follow_ups(self.grid.fill_with_unknown(), tile_moves, tile_values) if tile_moves else None
+
+        packed_move = self.objective.select_best_move(possible_moves, tile_values, follow_up_scores)
         if packed_move is None:
             return None
 
         best_move, score = packed_move
         logger.info(f"Best move is {str(best_move)} with score {score}.")
-        return best_move
+        return packed_move
 
-    def _find_possible_move(self):
-        possible_moves = {create_item_move(item) for item in self.items}
+    def find_status(self) -> Status:
+        # Every owned key is detected as its own item
+        return Status(key_quantity=len([item for item in self.items if item.type == ItemType.KEY]))
 
+    def _find_possible_move(self, refill_model: RefillModel | None = None, move_index: MoveIndex | None = None):
         if len(self.grid) >= properties.MIN_TILE_THRESHOLD:
-            possible_moves |= self.grid.fill_with_unknown().find_possible_moves()
+            grid = self.grid.fill_with_unknown()
+            tile_moves = move_index.find_possible_moves(grid, refill_model) if move_index is not None else grid.find_possible_moves(refill_model)
+            possible_moves = plan_item_moves(grid, self.items, refill_model, tile_moves) | tile_moves
         else:
             logger.warning(f"Found only {len(self.grid)} tiles. Not counting grid in moves selection.")
+            possible_moves = plan_item_moves(EmptyGrid(), self.items)
 
         return possible_moves
@@ -2,17 +2,22 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import List, Set, Tuple, Sized, Iterable, Dict
+from typing import List, Set, Tuple, Sized, Iterable
 
 from frozendict import frozendict
 
+from src.domain.impact import Impact
 from src.domain.objective import TileMove
-from src.domain.screen import Point
-from src.domain.tile import TileType, Tile, Cluster
+from src.domain.refill import RefillModel
+from src.domain.screen import Point, board_point
+from src.domain.tile import TileType, Tile, Cluster, board_tile
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Cluster to complete, tile completing it and where the tile has to be moved
+MoveCandidate = Tuple[Cluster, Tile, Point]
+
 
 @dataclass(frozen=True)
 class Grid(Sized, Iterable[Tile]):
@@ -83,15 +88,18 @@ class Grid(Sized, Iterable[Tile]):
             if len(potential_cluster) == 2:
                 return Cluster(potential_type, potential_cluster)
 
-    def find_possible_moves(self) -> Set[TileMove]:
-        pairs = self.find_clusters()
+    def find_possible_moves(self, refill_model: RefillModel | None = None) -> Set[TileMove]:
+        return set(create_tile_moves(*self.simulate_possible_moves(), refill_model))
 
-        if not pairs:
-            return set()
+    def simulate_possible_moves(self) -> Tuple[List[MoveCandidate], List[Tuple[Impact, Grid]]]:
+        candidates = self.find_move_candidates(self.find_clusters())
+        return candidates, [self.simulate_line_shift(matching_tile.grid_position, destination) for _, matching_tile, destination in candidates]
 
-        movements = set()
+    def find_move_candidates(self, clusters: Iterable[Cluster]) -> List[MoveCandidate]:
+        """Each tile that completes a cluster when moved, with the destination completing it."""
+        candidates = []
 
-        for cluster in pairs:
+        for cluster in clusters:
 
             completing_row_indices = cluster.find_completing_row_indices()
             if completing_row_indices:
@@ -100,8 +108,7 @@ class Grid(Sized, Iterable[Tile]):
 
                 matching_tiles = {(row_index, tile) for row_index, row in completing_cluster_rows.items() for tile in row if tile.type == cluster.type}
                 for y, matching_tile in matching_tiles:
-                    destination = Point(x, y)
-                    movements.add(TileMove(self.simulate_line_shift(matching_tile.grid_position, destination)[0], cluster, matching_tile, destination))
+                    candidates.append((cluster, matching_tile, board_point(x, y)))
             else:
                 y = cluster.get_completed_line_index()
                 completing_column_indices = cluster.find_completing_column_indices()
@@ -109,35 +116,31 @@ class Grid(Sized, Iterable[Tile]):
 
                 matching_tiles = {(row_no, tile) for row_no, row in completing_cluster_columns.items() for tile in row if tile.type == cluster.type}
                 for x, matching_tile in matching_tiles:
-                    destination = Point(x, y)
-                    movements.add(TileMove(self.simulate_line_shift(matching_tile.grid_position, destination)[0], cluster, matching_tile, destination))
+                    candidates.append((cluster, matching_tile, board_point(x, y)))
 
-        return movements
+        return candidates
 
-    def simulate_line_shift(self, shift_start: Point, shift_destination: Point) -> Tuple[Dict[TileType, int], Grid]:
+    def simulate_line_shift(self, shift_start: Point, shift_destination: Point) -> Tuple[Impact, Grid]:
         """
         1. Shift
         2. Remove combining tiles
         3. Gravity
         4. Loop 2-3
         """
-        simulated_grid = self.shift(shift_start, shift_destination)
+        return self.shift(shift_start, shift_destination).simulate_cascade()
 
+    def simulate_cascade(self) -> Tuple[Impact, Grid]:
         combining_tiles = set()
-        new_combining_tiles, simulated_grid = simulated_grid.remove_completed_combos()
+        new_combining_tiles, simulated_grid = self.remove_completed_combos()
         while new_combining_tiles:
             combining_tiles |= new_combining_tiles
             simulated_grid = simulated_grid.gravity()
             new_combining_tiles, simulated_grid = simulated_grid.remove_completed_combos()
 
-        impact = dict()
-        for tile in combining_tiles:
-            if tile.type not in impact:
-                impact[tile.type] = 0
-
-            impact[tile.type] += 1
+        return Impact.count(tile.type for tile in combining_tiles), simulated_grid.fill_with_unknown()
 
-        return frozendict(impact), simulated_grid.fill_with_unknown()
+    def transform(self, from_type: TileType, to_type: TileType) -> Grid:
+        return Grid([board_tile(to_type, tile.grid_position) if tile.type == from_type else tile for tile in self.tiles], self.size)
 
     def shift(self, shift_start: Point, shift_destination: Point):
         assert shift_start.x == shift_destination.x or shift_start.y == shift_destination.y
@@ -147,12 +150,12 @@ class Grid(Sized, Iterable[Tile]):
         if shift.y == 0:
             line = self.get_row(shift_start.y)
             distance = shift.x
-            new_line = [Tile(tile.type, Point(x, shift_start.y)) for x, tile in enumerate(line[-distance:] + line[:-distance])]
+            new_line = [board_tile(tile.type, board_point(x, shift_start.y)) for x, tile in enumerate(line[-distance:] + line[:-distance])]
             return self.set_row(shift_start.y, new_line)
         else:
             line = self.get_column(shift_start.x)
             distance = shift.y
-            new_line = [Tile(tile.type, Point(shift_start.x, y)) for y, tile in enumerate(line[-distance:] + line[:-distance])]
+            new_line = [board_tile(tile.type, board_point(shift_start.x, y)) for y, tile in enumerate(line[-distance:] + line[:-distance])]
             return self.set_column(shift_start.x, new_line)
 
     def remove_completed_combos(self):
@@ -176,7 +179,7 @@ class Grid(Sized, Iterable[Tile]):
                 continue
 
             for i, tile in enumerate(column):
-                fallen_tiles.append(Tile(tile.type, Point(tile.grid_position.x, missing_tiles + i)))
+                fallen_tiles.append(board_tile(tile.type, board_point(tile.grid_position.x, missing_tiles + i)))
 
         fallen_tiles.sort(key=lambda x: x.grid_position)
 
@@ -185,24 +188,30 @@ class Grid(Sized, Iterable[Tile]):
     def fill_with_unknown(self) -> Grid:
         return self
 
+    def find_missing_positions(self) -> List[Point]:
+        return []
+
 
 class InconsistentGrid(Grid):
     def find_clusters(self, minimal_quantity=2, maximal_distance=3) -> Set[Tuple[Tile]]:
         return set()
 
     def fill_with_unknown(self) -> Grid:
-        tiles = self.tiles.copy()
+        tiles_per_position = {tile.grid_position: tile for tile in self.tiles}
 
         # FIXME there should be a better approximation for screensize... meh what ever
-        for y in range(0, self.size.y):
-            for x in range(0, self.size.x):
-                index = x + y * self.size.x
-                expected_grid_position = Point(x, y)
-                if len(tiles) <= index or tiles[index].grid_position != expected_grid_position:
-                    tiles.insert(index, Tile(TileType.UNKNOWN, expected_grid_position))
+        tiles = [
+            tiles_per_position.get(position) or board_tile(TileType.UNKNOWN, position)
+            for position in (board_point(x, y) for y in range(0, self.size.y) for x in range(0, self.size.x))
+        ]
 
         return Grid(tiles, self.size)
 
+    def find_missing_positions(self) -> List[Point]:
+        present_positions = {tile.grid_position for tile in self.tiles}
+        positions = (board_point(x, y) for y in range(0, self.size.y) for x in range(0, self.size.x))
+        return [position for position in positions if position not in present_positions]
+
 
 class EmptyGrid(Grid):
     def __init__(self):
@@ -210,3 +219,15 @@ class EmptyGrid(Grid):
 
     def find_clusters(self, minimal_quantity=2, maximal_distance=3) -> Set[Tuple[Tile]]:
         return set()
+
+
+def create_tile_moves(candidates: List[MoveCandidate], simulations: List[Tuple[Impact, Grid]], refill_model: RefillModel | None = None) -> List[TileMove]:
+    """One tile move per candidate, in the same order."""
+    if refill_model is None:
+        return [TileMove(impact, *candidate) for candidate, (impact, _) in zip(candidates, simulations)]
+
+    expected_impacts = refill_model.calculate_expected_impacts([simulated_grid for _, simulated_grid in simulations])
+    return [
+        TileMove(impact, *candidate, expected_impact=frozendict(expected_impact))
+        for candidate, (impact, _), expected_impact in zip(candidates, simulations, expected_impacts)
+    ]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from src.domain.tile import TileType, TILE_TYPES, TILE_TYPE_INDICES
+
+
+class Impact(Mapping[TileType, int]):
+    """
+    Quantity of tiles removed per TileType, packed as one byte per TileType ordinal.
+    Reads like the sparse mapping it replaces, only TileTypes with a positive quantity are keys.
+    Hash and equality work on the fixed-length bytes, so deduplicating moves does not iterate the mapping.
+    """
+
+    __slots__ = ("_quantities",)
+
+    def __init__(self, quantities: bytes = bytes(len(TILE_TYPES))) -> None:
+        assert len(quantities) == len(TILE_TYPES)
+        self._quantities = bytes(quantities)
+
+    @staticmethod
+    def of(quantity_per_tile_type: Mapping[TileType, int]) -> Impact:
+        quantities = bytearray(len(TILE_TYPES))
+        for tile_type, quantity in quantity_per_tile_type.items():
+            quantities[TILE_TYPE_INDICES[tile_type]] = quantity
+        return Impact(quantities)
+
+    @staticmethod
+    def count(tile_types: Iterable[TileType]) -> Impact:
+        quantities = bytearray(len(TILE_TYPES))
+        for tile_type in tile_types:
+            quantities[TILE_TYPE_INDICES[tile_type]] += 1
+        return Impact(quantities)
+
+    def __getitem__(self, tile_type: TileType) -> int:
+        quantity = self._quantities[TILE_TYPE_INDICES[tile_type]]
+        if quantity == 0:
+            raise KeyError(tile_type)
+        return quantity
+
+    def __iter__(self) -> Iterator[TileType]:
+        return (tile_type for tile_type, quantity in zip(TILE_TYPES, self._quantities) if quantity > 0)
+
+    def __len__(self) -> int:
+        return len(self._quantities) - self._quantities.count(0)
+
+    def __hash__(self) -> int:
+        # Bytes cache their hash
+        return hash(self._quantities)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Impact):
+            return self._quantities == other._quantities
+        return super().__eq__(other)
+
+    def __add__(self, other: Impact) -> Impact:
+        return Impact(bytes(min(255, quantity + other_quantity) for quantity, other_quantity in zip(self._quantities, other._quantities)))
+
+    def __repr__(self) -> str:
+        return f"Impact({ {str(tile_type): quantity for tile_type, quantity in self.items()} })"
+
+    def __reduce__(self):
+        return Impact, (self._quantities,)
+
+    def as_array(self) -> np.ndarray:
+        """Read-only view over the quantities, indexed by TileType ordinal. Nothing is copied."""
+        return np.frombuffer(self._quantities, dtype=np.uint8)
+
+
+NO_IMPACT = Impact()
@@ -31,7 +31,7 @@ class ItemType(Enum):
         return self.name
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Item:
     type: ItemType
     screen_square: ScreenSquare
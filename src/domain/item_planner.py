@@ -0,0 +1,103 @@
+import logging
+from itertools import permutations
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+from src.domain.grid import Grid, MoveCandidate, create_tile_moves
+from src.domain.impact import Impact
+from src.domain.item import Item, ItemType
+from src.domain.objective import Move, ItemMove, ChainedMove, TileMove, create_item_move
+from src.domain.refill import RefillModel
+from src.domain.screen import Point
+from src.domain.tile import TileType
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Scrolls turn every tile of a type into another type
+TILE_TRANSFORMATIONS: Dict[ItemType, Tuple[TileType, TileType]] = {
+    ItemType.LOG_TO_KEY_SCROLL: (TileType.LOGS, TileType.KEY),
+    ItemType.LOG_TO_SWORD_SCROLL: (TileType.LOGS, TileType.SWORD),
+    ItemType.LOG_TO_WAND_SCROLL: (TileType.LOGS, TileType.WAND),
+    ItemType.ROCK_TO_KEY_SCROLL: (TileType.ROCKS, TileType.KEY),
+    ItemType.ROCK_TO_SWORD_SCROLL: (TileType.ROCKS, TileType.SWORD),
+    ItemType.ROCK_TO_WAND_SCROLL: (TileType.ROCKS, TileType.WAND),
+}
+
+MAX_CHAINED_ITEM_QUANTITY = 2
+
+
+def simulate_item_use(grid: Grid, item: Item) -> Tuple[Impact, Grid]:
+    from_type, to_type = TILE_TRANSFORMATIONS[item.type]
+    return grid.transform(from_type, to_type).simulate_cascade()
+
+
+def plan_item_moves(grid: Grid, items: FrozenSet[Item], refill_model: RefillModel | None = None, tile_moves: Set[TileMove] | None = None) -> Set[Move]:
+    """
+    Items without effect on the board keep their flat impact. Scrolls are simulated on the grid, alone, chained with other scrolls,
+    and followed by each tile move possible on the transformed grid. Chains are done without detecting the game state between moves.
+    Chains only doing what a tile move does without the scrolls are left out, ties between moves are broken on the quantity of items used.
+    Tile moves already found on the grid are reused, and refills are only sampled for the chains that are kept.
+    """
+    moves: Set[Move] = {create_item_move(item) for item in items if item.type not in TILE_TRANSFORMATIONS or not grid.tiles}
+    scrolls = [item for item in items if item.type in TILE_TRANSFORMATIONS]
+    if not scrolls or not grid.tiles:
+        return moves
+
+    tile_moves = tile_moves if tile_moves is not None else grid.find_possible_moves()
+    impact_per_shift = {_shift_of(tile_move): tile_move.impact for tile_move in tile_moves}
+    kept_item_moves: List[Tuple[ItemMove, ...]] = []
+    kept_candidates: List[MoveCandidate] = []
+    kept_simulations: List[Tuple[Impact, Grid]] = []
+    for quantity in range(1, min(MAX_CHAINED_ITEM_QUANTITY, len(scrolls)) + 1):
+        for chained_scrolls in permutations(scrolls, quantity):
+            item_moves, simulated_grid = _simulate_chain(grid, chained_scrolls)
+            if item_moves is None:
+                continue
+
+            moves.add(item_moves[0] if len(item_moves) == 1 else ChainedMove(sum((move.impact for move in item_moves), Impact()), item_moves))
+            for candidate, simulation in zip(*simulated_grid.simulate_possible_moves()):
+                if _is_wasting_items(item_moves, simulation[0], impact_per_shift.get(_shift_of_candidate(candidate))):
+                    continue
+
+                kept_item_moves.append(item_moves)
+                kept_candidates.append(candidate)
+                kept_simulations.append(simulation)
+
+    # All kept chains are sampled together
+    chained_tile_moves = create_tile_moves(kept_candidates, kept_simulations, refill_model)
+    for item_moves, tile_move in zip(kept_item_moves, chained_tile_moves):
+        chained_moves = (*item_moves, tile_move)
+        moves.add(ChainedMove(sum((move.impact for move in chained_moves), Impact()), chained_moves, expected_impact=tile_move.expected_impact))
+
+    return moves
+
+
+def _shift_of(tile_move: TileMove) -> Tuple[Point, Point]:
+    return tile_move.tile_to_move.grid_position, tile_move.grid_destination
+
+
+def _shift_of_candidate(candidate: MoveCandidate) -> Tuple[Point, Point]:
+    _, matching_tile, destination = candidate
+    return matching_tile.grid_position, destination
+
+
+def _is_wasting_items(item_moves: Tuple[ItemMove, ...], impact: Impact, original_impact: Impact | None) -> bool:
+    """
+    Scrolls combining nothing, before a tile move as good without them, would be spent for nothing.
+    Only the certain impacts are compared, expected impacts are sampled and never equal from one grid to another.
+    """
+    return original_impact is not None and all(not item_move.impact for item_move in item_moves) and original_impact == impact
+
+
+def _simulate_chain(grid: Grid, scrolls: Tuple[Item, ...]) -> Tuple[Tuple[ItemMove, ...] | None, Grid]:
+    """Chains where a scroll has nothing left to transform are skipped, the chain without that scroll is as good."""
+    item_moves = []
+    for scroll in scrolls:
+        from_type, _ = TILE_TRANSFORMATIONS[scroll.type]
+        if len(scrolls) > 1 and not any(tile.type == from_type for tile in grid):
+            return None, grid
+
+        impact, grid = simulate_item_use(grid, scroll)
+        item_moves.append(create_item_move(scroll, impact))
+
+    return tuple(item_moves), grid
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import abc
+import logging
+from time import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.domain.grid import Grid
+from src.domain.move_index import MoveIndex
+from src.domain.objective import TileMove
+from src.domain.screen import Point, board_point
+from src.domain.tile import TILE_TYPES, TILE_TYPE_INDICES, board_tile
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Follow-up moves are less certain than the move itself, since the refilled tiles are not known
+FOLLOW_UP_DISCOUNT = 0.5
+
+# Start and destination of the shift, as x and y
+EncodedShift = Tuple[int, int, int, int]
+
+# Each worker process of a planner reuses its own index from one simulated grid to the next. Never used by the threads of the bot.
+_worker_move_index = MoveIndex()
+
+
+def encode_grid(grid: Grid) -> bytes:
+    """Size then one TileType ordinal per tile, in row-major order. Sent to the planner processes instead of pickled tiles."""
+    return bytes([grid.size.x, grid.size.y, *(TILE_TYPE_INDICES[tile.type] for tile in grid.tiles)])
+
+
+def decode_grid(encoded_grid: bytes) -> Grid:
+    size = Point(encoded_grid[0], encoded_grid[1])
+    types = encoded_grid[2:]
+    return Grid([board_tile(TILE_TYPES[types[y * size.x + x]], board_point(x, y)) for y in range(size.y) for x in range(size.x)], size)
+
+
+def encode_shift(move: TileMove) -> EncodedShift:
+    return move.tile_to_move.grid_position.x, move.tile_to_move.grid_position.y, move.grid_destination.x, move.grid_destination.y
+
+
+def evaluate_follow_up(
+    encoded_grid: bytes, encoded_shift: EncodedShift, tile_values: Tuple[float, ...], depth: int, deadline: float, move_index: MoveIndex | None = None
+) -> float | None:
+    """
+    Best discounted score reachable in the next plies after shifting, on the simulated grid where refilled tiles are unknown.
+    Runs in planner processes, so everything comes in encoded form. The deadline is a wall clock time, after which the search stops where it is.
+    None when the deadline stopped the search, the score would then be lower than a complete search would find.
+    Without a move index, the index of the worker process is used.
+    """
+    grid = decode_grid(encoded_grid)
+    start_x, start_y, destination_x, destination_y = encoded_shift
+    _, simulated_grid = grid.simulate_line_shift(board_point(start_x, start_y), board_point(destination_x, destination_y))
+    score = _search(simulated_grid, np.array(tile_values), depth, deadline, move_index if move_index is not None else _worker_move_index)
+    return score if time() <= deadline else None
+
+
+def _search(grid: Grid, tile_values: np.ndarray, depth: int, deadline: float, move_index: MoveIndex) -> float:
+    if depth <= 0 or time() > deadline:
+        return 0
+
+    _, simulations = move_index.simulate_possible_moves(grid)
+    best_score = 0
+    for impact, simulated_grid in simulations:
+        if time() > deadline:
+            break
+
+        score = float(impact.as_array() @ tile_values) + _search(simulated_grid, tile_values, depth - 1, deadline, move_index)
+        best_score = max(best_score, score)
+
+    return FOLLOW_UP_DISCOUNT * best_score
+
+
+class Planner(metaclass=abc.ABCMeta):
+    @abc.abstractmethod
+    def evaluate_follow_ups(self, grid: Grid, moves: List[TileMove], tile_values: np.ndarray) -> Dict[TileMove, float]:
+        """
+        Follow-up score of each move, searched to the same depth.
+        Empty when not every move could be evaluated before the deadline, so moves are never compared on partial searches.
+        Only tile moves are searched. Item and chained moves count as having no follow-up, which biases the selection towards tile moves:
+        chains multiply the moves to search, and searching them all would miss the deadline on most frames with items.
+        """
+        raise NotImplementedError
+
+
+class SequentialPlanner(Planner):
+    """Searches in the calling thread, with its own move index, so each bot thread needs its own planner."""
+
+    def __init__(self, depth: int, deadline_seconds: float) -> None:
+        self.depth = depth
+        self.deadline_seconds = deadline_seconds
+        self.move_index = MoveIndex()
+
+    def evaluate_follow_ups(self, grid: Grid, moves: List[TileMove], tile_values: np.ndarray) -> Dict[TileMove, float]:
+        deadline = time() + self.deadline_seconds
+        encoded_grid = encode_grid(grid)
+        follow_up_scores = {}
+        for move in moves:
+            follow_up_score = evaluate_follow_up(encoded_grid, encode_shift(move), tuple(tile_values), self.depth, deadline, self.move_index)
+            if follow_up_score is None:
+                logger.info(f"Evaluated {len(follow_up_scores)} of {len(moves)} moves before the deadline. Ignoring follow-ups.")
+                return {}
+            follow_up_scores[move] = follow_up_score
+        return follow_up_scores
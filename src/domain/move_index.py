@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple, FrozenSet
+
+from frozendict import FrozenOrderedDict, frozendict
+
+from src.domain.grid import Grid, MoveCandidate, create_tile_moves
+from src.domain.impact import Impact
+from src.domain.objective import TileMove
+from src.domain.refill import RefillModel
+from src.domain.screen import Point, board_point
+from src.domain.tile import TileType, Tile, Cluster, board_tile
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Flat indices, in row-major order, of the tiles of a triple
+Triple = Tuple[int, int, int]
+
+# Triples read around a changed cell. A combo can only appear in a triple crossing a changed cell.
+COMBO_REACH = 2
+
+
+@dataclass(frozen=True)
+class CachedSimulation:
+    impact: Impact
+    # Tiles of the simulated grid which differ from the grid the move is done on, by flat index
+    simulated_tiles: Dict[int, Tile]
+    # Flat indices of every tile the simulation outcome depends on
+    footprint: FrozenSet[int]
+
+
+def find_triples(size: Point) -> List[Triple]:
+    """Same triples as Grid.get_triples, as flat indices."""
+    columns = [tuple((y + i) * size.x + x for i in range(3)) for x in range(size.x) for y in range(size.y - 2)]
+    rows = [tuple(y * size.x + x + i for i in range(3)) for y in range(size.y) for x in range(size.x - 2)]
+    return columns + rows
+
+
+def simulate_line_shift(grid: Grid, shift_start: Point, shift_destination: Point) -> Tuple[Set[Tuple[TileType, int]], List[TileType | None], Set[int]]:
+    """
+    Same outcome as Grid.simulate_line_shift, on the flat tile types of a full grid without completed combo.
+    After each shift or gravity, only triples crossing a changed tile are evaluated.
+    Returns the combining tile types with their flat index when removed, the simulated types with None for emptied tiles, and every changed flat index.
+    """
+    size = grid.size
+    types: List[TileType | None] = [tile.type for tile in grid.tiles]
+
+    if shift_start.y == shift_destination.y:
+        line = [shift_start.y * size.x + x for x in range(size.x)]
+        distance = shift_destination.x - shift_start.x
+    else:
+        line = [y * size.x + shift_start.x for y in range(size.y)]
+        distance = shift_destination.y - shift_start.y
+    line_types = [types[index] for index in line]
+    for i, index in enumerate(line):
+        types[index] = line_types[(i - distance) % len(line)]
+
+    changed_indices = set(line)
+    new_changed_indices = set(line)
+    combining_tiles: Set[Tuple[TileType, int]] = set()
+    while True:
+        removed_indices = _find_completed_indices(types, size, new_changed_indices)
+        if not removed_indices:
+            return combining_tiles, types, changed_indices
+
+        combining_tiles |= {(types[index], index) for index in removed_indices}
+        for index in removed_indices:
+            types[index] = None
+
+        new_changed_indices = _gravity(types, size, removed_indices)
+        changed_indices |= new_changed_indices
+
+
+def _find_completed_indices(types: List[TileType | None], size: Point, changed_indices: Set[int]) -> Set[int]:
+    completed_indices = set()
+
+    # Like Grid.get_column, emptied tiles are skipped, so column triples are made of present tiles only once settled at the bottom
+    for x in {index % size.x for index in changed_indices}:
+        changed_ys = {index // size.x for index in changed_indices if index % size.x == x}
+        for y in range(max(0, min(changed_ys) - 2), min(size.y - 2, max(changed_ys) + 1)):
+            triple = (y * size.x + x, (y + 1) * size.x + x, (y + 2) * size.x + x)
+            if _is_completed([types[index] for index in triple]):
+                completed_indices.update(triple)
+
+    # Like Grid.get_row, triples of a row with emptied tiles are made of the remaining tiles, even when not adjacent
+    for y in {index // size.x for index in changed_indices}:
+        row = [y * size.x + x for x in range(size.x) if types[y * size.x + x] is not None]
+        for i in range(len(row) - 2):
+            triple = row[i : i + 3]
+            if _is_completed([types[index] for index in triple]):
+                completed_indices.update(triple)
+
+    return completed_indices
+
+
+def _is_completed(triple_types: List[TileType | None]) -> bool:
+    if None in triple_types:
+        return False
+
+    different_types = {tile_type for tile_type in triple_types if tile_type is not TileType.STAR}
+    return len(different_types) == 1 and TileType.UNKNOWN not in different_types
+
+
+def _gravity(types: List[TileType | None], size: Point, removed_indices: Set[int]) -> Set[int]:
+    """Returns the changed flat indices, from the top of each column to its lowest removed tile."""
+    changed_indices = set()
+    for x in {index % size.x for index in removed_indices}:
+        bottom = max(index // size.x for index in removed_indices if index % size.x == x)
+        column = [y * size.x + x for y in range(bottom + 1)]
+        remaining_types = [types[index] for index in column if types[index] is not None]
+        fallen_types = [None] * (len(column) - len(remaining_types)) + remaining_types
+        for index, tile_type in zip(column, fallen_types):
+            types[index] = tile_type
+        changed_indices.update(column)
+
+    return changed_indices
+
+
+class MoveIndex:
+    """
+    Clusters and simulated moves of the last indexed grid, kept up to date from one grid to the next.
+    Only triples crossing a changed tile are re-evaluated, and a simulated move is only invalidated when a tile of its footprint changed.
+
+    The footprint of a move is the shifted line and the tiles moved by gravity, dilated by the reach of a combo.
+    Outside of it, the simulation only reads triples which were not completed before the move, so the outcome can not change.
+    This only holds when the grid has no completed combo, otherwise every move is simulated again.
+    """
+
+    def __init__(self) -> None:
+        self.grid: Grid | None = None
+        self.triples: List[Triple] = []
+        self.triples_per_index: List[List[Triple]] = []
+        self.pair_per_triple: Dict[Triple, Cluster | None] = {}
+        self.cluster_counts: Counter[Cluster] = Counter()
+        self.completed_triples: Set[Triple] = set()
+        self.simulations: Dict[MoveCandidate, CachedSimulation] = {}
+        # Expected impact of the refills after each cached simulation, invalidated with it
+        self.expected_impacts: Dict[MoveCandidate, FrozenOrderedDict[TileType, float]] = {}
+        self.candidates_per_index: Dict[int, Set[MoveCandidate]] = {}
+
+    def find_possible_moves(self, grid: Grid, refill_model: RefillModel | None = None) -> Set[TileMove]:
+        """Same moves as Grid.find_possible_moves for a full grid."""
+        candidates, simulations = self.simulate_possible_moves(grid)
+        if refill_model is None:
+            return set(create_tile_moves(candidates, simulations))
+
+        expected_impacts = self._find_expected_impacts(candidates, simulations, refill_model)
+        return {
+            TileMove(impact, *candidate, expected_impact=expected_impact)
+            for candidate, (impact, _), expected_impact in zip(candidates, simulations, expected_impacts)
+        }
+
+    def simulate_possible_moves(self, grid: Grid) -> Tuple[List[MoveCandidate], List[Tuple[Impact, Grid]]]:
+        self.update(grid)
+
+        clusters = [cluster for cluster, count in self.cluster_counts.items() if count > 0]
+        candidates = self.grid.find_move_candidates(clusters)
+        return candidates, [self._simulate(candidate) for candidate in candidates]
+
+    def update(self, grid: Grid) -> List[int]:
+        """Returns the flat indices of the tiles which changed since the last indexed grid."""
+        if self.grid is None or self.grid.size != grid.size:
+            self._reset(grid.size)
+            changed_indices = list(range(len(grid.tiles)))
+        else:
+            changed_indices = [index for index, (tile, indexed_tile) in enumerate(zip(grid.tiles, self.grid.tiles)) if tile != indexed_tile]
+
+        self.grid = grid
+        if not changed_indices:
+            return changed_indices
+
+        logger.debug(f"Updating move index for {len(changed_indices)} changed tiles.")
+        for triple in {triple for index in changed_indices for triple in self.triples_per_index[index]}:
+            triple_tiles = [grid.tiles[index] for index in triple]
+
+            previous_pair = self.pair_per_triple.get(triple)
+            if previous_pair is not None:
+                self.cluster_counts[previous_pair] -= 1
+                if self.cluster_counts[previous_pair] == 0:
+                    del self.cluster_counts[previous_pair]
+
+            pair = Grid._find_pair_in_triple(triple_tiles)
+            self.pair_per_triple[triple] = pair
+            if pair is not None:
+                self.cluster_counts[pair] += 1
+
+            if _is_completed([tile.type for tile in triple_tiles]):
+                self.completed_triples.add(triple)
+            else:
+                self.completed_triples.discard(triple)
+
+        for index in changed_indices:
+            for candidate in self.candidates_per_index.pop(index, set()):
+                self._invalidate(candidate)
+
+        return changed_indices
+
+    def _find_expected_impacts(
+        self, candidates: List[MoveCandidate], simulations: List[Tuple[Impact, Grid]], refill_model: RefillModel
+    ) -> List[FrozenOrderedDict[TileType, float]]:
+        """
+        Refills are only sampled for candidates without a cached simulation, or whose footprint changed.
+        Cached expected impacts are kept while the tile frequencies drift, a few frames of observed tiles barely move them.
+        """
+        cached = not self.completed_triples
+        sampled_indices = [i for i, candidate in enumerate(candidates) if not cached or candidate not in self.expected_impacts]
+        sampled_impacts = refill_model.calculate_expected_impacts([simulations[i][1] for i in sampled_indices])
+
+        expected_impacts = [self.expected_impacts.get(candidate) if cached else None for candidate in candidates]
+        for i, expected_impact in zip(sampled_indices, sampled_impacts):
+            expected_impacts[i] = frozendict(expected_impact)
+            if cached and candidates[i] in self.simulations:
+                self.expected_impacts[candidates[i]] = expected_impacts[i]
+        return expected_impacts
+
+    def _reset(self, size: Point) -> None:
+        self.triples = find_triples(size)
+        self.triples_per_index = [[] for _ in range(size.x * size.y)]
+        for triple in self.triples:
+            for index in triple:
+                self.triples_per_index[index].append(triple)
+
+        self.pair_per_triple = {}
+        self.cluster_counts = Counter()
+        self.completed_triples = set()
+        self.simulations = {}
+        self.expected_impacts = {}
+        self.candidates_per_index = {}
+
+    def _simulate(self, candidate: MoveCandidate) -> Tuple[Impact, Grid]:
+        _, matching_tile, destination = candidate
+        if self.completed_triples:
+            return self.grid.simulate_line_shift(matching_tile.grid_position, destination)
+
+        simulation = self.simulations.get(candidate)
+        if simulation is None:
+            simulation = self._cache(candidate)
+
+        tiles = self.grid.tiles.copy()
+        for index, tile in simulation.simulated_tiles.items():
+            tiles[index] = tile
+        return simulation.impact, Grid(tiles, self.grid.size)
+
+    def _cache(self, candidate: MoveCandidate) -> CachedSimulation:
+        size = self.grid.size
+        _, matching_tile, destination = candidate
+
+        combining_tiles, types, changed_indices = simulate_line_shift(self.grid, matching_tile.grid_position, destination)
+
+        changed_positions = [(index % size.x, index // size.x) for index in changed_indices]
+        footprint = {
+            (x + offset, y) if axis == 0 else (x, y + offset)
+            for x, y in changed_positions
+            for axis in (0, 1)
+            for offset in range(-COMBO_REACH, COMBO_REACH + 1)
+        }
+        footprint_indices = frozenset(y * size.x + x for x, y in footprint if 0 <= x < size.x and 0 <= y < size.y)
+
+        simulation = CachedSimulation(
+            Impact.count(tile_type for tile_type, _ in combining_tiles),
+            {
+                index: board_tile(types[index] if types[index] is not None else TileType.UNKNOWN, board_point(index % size.x, index // size.x))
+                for index in changed_indices
+                if types[index] is not self.grid.tiles[index].type
+            },
+            footprint_indices,
+        )
+
+        self.simulations[candidate] = simulation
+        for index in footprint_indices:
+            self.candidates_per_index.setdefault(index, set()).add(candidate)
+        return simulation
+
+    def _invalidate(self, candidate: MoveCandidate) -> None:
+        self.expected_impacts.pop(candidate, None)
+        simulation = self.simulations.pop(candidate, None)
+        if simulation is None:
+            return
+
+        for index in simulation.footprint:
+            candidates = self.candidates_per_index.get(index)
+            if candidates is not None:
+                candidates.discard(candidate)
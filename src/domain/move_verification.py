@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from enum import Enum, auto
+from functools import singledispatch
+from typing import FrozenSet, Sequence, Tuple
+
+from src.domain.board_tracker import predict_grid
+from src.domain.grid import Grid
+from src.domain.objective import Move, TileMove, ChainedMove
+from src.domain.screen import Point
+from src.domain.tile import TileType
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class MoveOutcome(Enum):
+    # The line shows the shifted tiles
+    LANDED = auto()
+    # The line still shows the tiles from before the move
+    MISSED = auto()
+    # Shifted tiles started to combine
+    CASCADE = auto()
+    # Too little of the line was recognized, or it matches nothing expected
+    UNKNOWN = auto()
+
+    def __str__(self):
+        return self.name
+
+
+@dataclass(frozen=True)
+class ExpectedLine:
+    """
+    The only row or column a tile move changes, before and after the shift.
+    Verifying a move only needs this line, so it can be told right after the drag, long before the whole board settles.
+    """
+
+    positions: Tuple[Point, ...]
+    before: Tuple[TileType, ...]
+    after: Tuple[TileType, ...]
+    # Positions of the line where the shifted tiles complete a combo
+    combining_positions: FrozenSet[Point]
+
+    @staticmethod
+    def of(grid: Grid, move: TileMove) -> ExpectedLine:
+        grid = grid.fill_with_unknown()
+        shift_start, shift_destination = move.calculate_shift()
+        shifted_grid = grid.shift(shift_start, shift_destination)
+        if shift_start.y == shift_destination.y:
+            line, shifted_line = grid.get_row(shift_start.y), shifted_grid.get_row(shift_start.y)
+        else:
+            line, shifted_line = grid.get_column(shift_start.x), shifted_grid.get_column(shift_start.x)
+
+        positions = tuple(tile.grid_position for tile in line)
+        combining_tiles, _ = shifted_grid.remove_completed_combos()
+        return ExpectedLine(
+            positions,
+            tuple(tile.type for tile in line),
+            tuple(tile.type for tile in shifted_line),
+            frozenset(tile.grid_position for tile in combining_tiles if tile.grid_position in positions),
+        )
+
+    def verify(self, detected_types: Sequence[TileType]) -> MoveOutcome:
+        """
+        Unknown tiles are ignored, they are either not detected or in the middle of an animation.
+        A move is only said to have missed when the line surely did not change, so a retried move never shifts the line twice.
+        """
+        if all(detected_type == TileType.UNKNOWN for detected_type in detected_types):
+            return MoveOutcome.UNKNOWN
+
+        mismatching_positions = {
+            position
+            for position, detected_type, expected_type in zip(self.positions, detected_types, self.after)
+            if expected_type != TileType.UNKNOWN
+            and detected_type != expected_type
+            and (detected_type != TileType.UNKNOWN or position in self.combining_positions)
+        }
+        if not mismatching_positions:
+            return MoveOutcome.LANDED
+
+        compared = [
+            (detected_type, before_type, after_type)
+            for detected_type, before_type, after_type in zip(detected_types, self.before, self.after)
+            if detected_type != TileType.UNKNOWN and before_type != TileType.UNKNOWN
+        ]
+        line_unchanged = all(detected_type == before_type for detected_type, before_type, _ in compared)
+        line_shifted = any(before_type != after_type for _, before_type, after_type in compared)
+        if line_unchanged and line_shifted:
+            return MoveOutcome.MISSED
+
+        if mismatching_positions & self.combining_positions:
+            return MoveOutcome.CASCADE
+
+        return MoveOutcome.UNKNOWN
+
+
+@singledispatch
+def find_verified_step(move: Move, grid: Grid) -> Tuple[TileMove, Grid] | None:
+    """Tile move which can be verified once the move is done, with the grid it is done on. None when there is none."""
+    return None
+
+
+@find_verified_step.register
+def _(move: TileMove, grid: Grid) -> Tuple[TileMove, Grid] | None:
+    return move, grid
+
+
+@find_verified_step.register
+def _(move: ChainedMove, grid: Grid) -> Tuple[TileMove, Grid] | None:
+    """The last tile move of a chain is done on a predicted grid, never detected, so it is the step most worth verifying."""
+    last_move = move.moves[-1]
+    if not isinstance(last_move, TileMove):
+        return None
+
+    grid = grid.fill_with_unknown()
+    for chained_move in move.moves[:-1]:
+        grid = predict_grid(chained_move, grid)
+        if grid is None:
+            return None
+    return last_move, grid
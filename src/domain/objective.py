@@ -1,12 +1,15 @@
 import abc
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, auto
-from functools import reduce
-from typing import Set, Dict, Tuple
+from functools import cached_property
+from typing import Set, Tuple, Mapping
 
+import numpy as np
 from frozendict import FrozenOrderedDict, frozendict
 
+from src.domain.impact import Impact, NO_IMPACT
 from src.domain.item import Item, ItemType
+from src.domain.scoring import to_tile_vector, calculate_scores
 from src.domain.screen import ScreenSquare, Point
 from src.domain.tile import TileType, Tile, Cluster
 
@@ -117,128 +120,48 @@ TILE_VALUES_PER_OBJECTIVE_TYPES = {
 }
 
 ITEM_FLAT_IMPACT = {
-    ItemType.LOG_TO_KEY_SCROLL: frozendict(
-        {
-            TileType.KEY: 6,
-        }
-    ),
-    ItemType.LOG_TO_SWORD_SCROLL: frozendict(
-        {
-            TileType.SWORD: 6,
-        }
-    ),
-    ItemType.LOG_TO_WAND_SCROLL: frozendict(
-        {
-            TileType.WAND: 6,
-        }
-    ),
-    ItemType.ROCK_TO_KEY_SCROLL: frozendict(
-        {
-            TileType.KEY: 6,
-        }
-    ),
-    ItemType.ROCK_TO_SWORD_SCROLL: frozendict(
-        {
-            TileType.SWORD: 6,
-        }
-    ),
-    ItemType.ROCK_TO_WAND_SCROLL: frozendict(
-        {
-            TileType.WAND: 6,
-        }
-    ),
-    ItemType.KEY: frozendict(
-        {
-            TileType.KEY: 6,
-        }
-    ),
-    ItemType.AXE: frozendict(
-        {
-            TileType.SWORD: 6,
-        }
-    ),
-    ItemType.BATTLEAXE: frozendict(
-        {
-            TileType.SWORD: 6,
-        }
-    ),
-    ItemType.HALBERD: frozendict(
-        {
-            TileType.SWORD: 6,
-        }
-    ),
-    ItemType.GREAT_AXE: frozendict(
-        {
-            TileType.SWORD: 6,
-        }
-    ),
-    ItemType.RED_ORB: frozendict(
-        {
-            TileType.WAND: 6,
-        }
-    ),
-    ItemType.YELLOW_ORB: frozendict(
-        {
-            TileType.WAND: 6,
-        }
-    ),
-    ItemType.GREEN_ORB: frozendict(
-        {
-            TileType.WAND: 6,
-        }
-    ),
-    ItemType.PURPLE_ORB: frozendict(
-        {
-            TileType.WAND: 6,
-        }
-    ),
-    ItemType.BLUE_ORB: frozendict(
-        {
-            TileType.WAND: 6,
-        }
-    ),
-    ItemType.BREAD: frozendict(
-        {
-            TileType.SHIELD: 6,
-        }
-    ),
-    ItemType.CHEESE: frozendict(
-        {
-            TileType.SHIELD: 6,
-        }
-    ),
-    ItemType.COFFEE: frozendict(
-        {
-            TileType.SHIELD: 6,
-        }
-    ),
-    ItemType.HAM: frozendict(
-        {
-            TileType.SHIELD: 6,
-        }
-    ),
-    ItemType.PIE: frozendict(
-        {
-            TileType.SHIELD: 6,
-        }
-    ),
+    ItemType.LOG_TO_KEY_SCROLL: Impact.of({TileType.KEY: 6}),
+    ItemType.LOG_TO_SWORD_SCROLL: Impact.of({TileType.SWORD: 6}),
+    ItemType.LOG_TO_WAND_SCROLL: Impact.of({TileType.WAND: 6}),
+    ItemType.ROCK_TO_KEY_SCROLL: Impact.of({TileType.KEY: 6}),
+    ItemType.ROCK_TO_SWORD_SCROLL: Impact.of({TileType.SWORD: 6}),
+    ItemType.ROCK_TO_WAND_SCROLL: Impact.of({TileType.WAND: 6}),
+    ItemType.KEY: Impact.of({TileType.KEY: 6}),
+    ItemType.AXE: Impact.of({TileType.SWORD: 6}),
+    ItemType.BATTLEAXE: Impact.of({TileType.SWORD: 6}),
+    ItemType.HALBERD: Impact.of({TileType.SWORD: 6}),
+    ItemType.GREAT_AXE: Impact.of({TileType.SWORD: 6}),
+    ItemType.RED_ORB: Impact.of({TileType.WAND: 6}),
+    ItemType.YELLOW_ORB: Impact.of({TileType.WAND: 6}),
+    ItemType.GREEN_ORB: Impact.of({TileType.WAND: 6}),
+    ItemType.PURPLE_ORB: Impact.of({TileType.WAND: 6}),
+    ItemType.BLUE_ORB: Impact.of({TileType.WAND: 6}),
+    ItemType.BREAD: Impact.of({TileType.SHIELD: 6}),
+    ItemType.CHEESE: Impact.of({TileType.SHIELD: 6}),
+    ItemType.COFFEE: Impact.of({TileType.SHIELD: 6}),
+    ItemType.HAM: Impact.of({TileType.SHIELD: 6}),
+    ItemType.PIE: Impact.of({TileType.SHIELD: 6}),
 }
 
 
 @dataclass(frozen=True)
 class Move(metaclass=abc.ABCMeta):
-    impact: FrozenOrderedDict[TileType, int]
+    impact: Impact
+    expected_impact: FrozenOrderedDict[TileType, float] = field(default=frozendict(), kw_only=True)
 
     @abc.abstractmethod
     def calculate_grid_distance(self) -> int:
         raise NotImplementedError
 
-    def calculate_score(self, value_per_tile_type: Dict[TileType, int]) -> int:
-        return reduce(
-            lambda x, y: x + y,
-            [self.impact[tile_type] * value_per_tile_type.get(tile_type, 0) for tile_type in self.impact],
-            0,
-        )
+    @cached_property
+    def impact_vector(self) -> np.ndarray:
+        return self.impact.as_array() + to_tile_vector(self.expected_impact)
+
+    def calculate_score(self, tile_values: np.ndarray) -> float:
+        return float(self.impact_vector @ tile_values)
+
+    def count_items(self) -> int:
+        return 0
 
 
 @dataclass(frozen=True)
@@ -286,9 +209,28 @@ class ItemMove(Move):
     def calculate_grid_distance(self) -> int:
         return 0
 
+    def count_items(self) -> int:
+        return 1
+
+
+@dataclass(frozen=True)
+class ChainedMove(Move):
+    """Moves done one after the other, without detecting the game state in between. The impact is the sum of their impacts."""
+
+    moves: Tuple[Move, ...]
 
-def create_item_move(item: Item, impact: FrozenOrderedDict[TileType, int] | None = None) -> ItemMove:
-    return ItemMove(impact if impact is not None else ITEM_FLAT_IMPACT.get(item.type, frozendict()), item)
+    def __str__(self):
+        return " then ".join(str(move) for move in self.moves)
+
+    def calculate_grid_distance(self) -> int:
+        return sum(move.calculate_grid_distance() for move in self.moves)
+
+    def count_items(self) -> int:
+        return sum(move.count_items() for move in self.moves)
+
+
+def create_item_move(item: Item, impact: Impact | None = None) -> ItemMove:
+    return ItemMove(impact if impact is not None else ITEM_FLAT_IMPACT.get(item.type, NO_IMPACT), item)
 
 
 @dataclass(frozen=True)
@@ -296,11 +238,18 @@ class Objective:
     type: ObjectiveType = None
     screen_square: ScreenSquare = ScreenSquare()
 
-    def select_best_move(self, possible_moves: Set[TileMove]) -> Tuple[TileMove, int] | None:
-        value_per_tile_type = TILE_VALUES_PER_OBJECTIVE_TYPES.get(self.type, NO_OBJECTIVE_TILE_VALUES)
-
-        best_move = max(possible_moves, key=lambda x: (x.calculate_score(value_per_tile_type), -x.calculate_grid_distance()))
-        score = best_move.calculate_score(value_per_tile_type)
+    def select_best_move(
+        self, possible_moves: Set[Move], tile_values: np.ndarray, follow_up_scores: Mapping[Move, float] | None = None
+    ) -> Tuple[Move, float] | None:
+        """Tile values come from the scoring profiles, for the objective and the status of the player."""
+        moves = list(possible_moves)
+        scores = calculate_scores(np.stack([move.impact_vector for move in moves]), tile_values)
+        if follow_up_scores:
+            scores += np.array([follow_up_scores.get(move, 0) for move in moves])
+
+        # Between moves as good, items are kept for later, then the shortest move is the safest
+        best_index = max(range(len(moves)), key=lambda i: (scores[i], -moves[i].count_items(), -moves[i].calculate_grid_distance()))
+        best_move, score = moves[best_index], float(scores[best_index])
 
         if score <= 0:
             return None
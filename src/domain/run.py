@@ -0,0 +1,66 @@
+import logging
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from typing import List
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class GameScreen(Enum):
+    GAME = auto()
+    END_OF_RUN = auto()
+    MENU = auto()
+    UNKNOWN = auto()
+
+    def __str__(self):
+        return self.name
+
+
+class RunPhase(Enum):
+    WAITING = auto()
+    PLAYING = auto()
+    ENDED = auto()
+
+
+@dataclass
+class RunStatistics:
+    number: int
+    start_time: float
+    end_time: float | None = None
+    moves: int = 0
+
+    @property
+    def duration(self) -> float | None:
+        return self.end_time - self.start_time if self.end_time is not None else None
+
+
+@dataclass
+class RunLifecycle:
+    """
+    Follows runs from the screens seen between moves. A run starts on the first game screen, and ends on the end-of-run or menu screen.
+    Unknown screens, like loading screens or animations, change nothing.
+    """
+
+    phase: RunPhase = RunPhase.WAITING
+    runs: List[RunStatistics] = field(default_factory=list)
+
+    @property
+    def current_run(self) -> RunStatistics | None:
+        return self.runs[-1] if self.runs and self.phase is RunPhase.PLAYING else None
+
+    def observe(self, screen: GameScreen, now: float) -> None:
+        if screen is GameScreen.GAME:
+            if self.phase is not RunPhase.PLAYING:
+                self.runs.append(RunStatistics(len(self.runs) + 1, now))
+                self.phase = RunPhase.PLAYING
+                logger.info(f"Run {len(self.runs)} started.")
+        elif screen in (GameScreen.END_OF_RUN, GameScreen.MENU) and self.phase is RunPhase.PLAYING:
+            run = self.runs[-1]
+            run.end_time = now
+            self.phase = RunPhase.ENDED
+            logger.info(f"Run {run.number} ended after {run.duration:.0f}s and {run.moves} moves.")
+
+    def record_move(self) -> None:
+        if self.current_run is not None:
+            self.current_run.moves += 1
@@ -0,0 +1,18 @@
+from typing import Mapping
+
+import numpy as np
+
+from src.domain.tile import TileType, TILE_TYPES, TILE_TYPE_INDICES
+
+
+def to_tile_vector(value_per_tile_type: Mapping[TileType, float]) -> np.ndarray:
+    """Dense vector indexed by TileType ordinal. Used both for the values of an objective and for the impact of a move."""
+    vector = np.zeros(len(TILE_TYPES))
+    for tile_type, value in value_per_tile_type.items():
+        vector[TILE_TYPE_INDICES[tile_type]] += value
+    return vector
+
+
+def calculate_scores(impact_vectors: np.ndarray, tile_values: np.ndarray) -> np.ndarray:
+    """Impact vectors are stacked as rows, so all candidates are scored with one product."""
+    return impact_vectors @ tile_values
@@ -0,0 +1,52 @@
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.domain.objective import ObjectiveType, TILE_VALUES_PER_OBJECTIVE_TYPES, NO_OBJECTIVE_TILE_VALUES
+from src.domain.scoring import to_tile_vector
+from src.domain.status import Status
+from src.domain.tile import TileType, TILE_TYPES
+
+
+@dataclass(frozen=True)
+class StatusModifiers:
+    """
+    Deltas added to tile values depending on the status of the player.
+    Deltas are added rather than multiplied, so a negative delta always makes a tile less valuable, whatever the sign of its value.
+    """
+
+    # (minimal key quantity, deltas), sorted by minimal key quantity
+    key_quantity_deltas: List[Tuple[int, Dict[TileType, float]]] = field(default_factory=list)
+
+
+class ScoringProfiles:
+    """
+    Tile values for every objective and every status, compiled once in lookup tables.
+    Finding the values for a game state is a single dict lookup, whatever the quantity of moves to score.
+    """
+
+    def __init__(
+        self, tile_values_per_objective_types: Dict[ObjectiveType | None, Dict[TileType, float]], status_modifiers: StatusModifiers = StatusModifiers()
+    ) -> None:
+        self._minimal_key_quantities = [minimal_quantity for minimal_quantity, _ in status_modifiers.key_quantity_deltas]
+
+        key_deltas = [np.zeros(len(TILE_TYPES))] + [to_tile_vector(deltas) for _, deltas in status_modifiers.key_quantity_deltas]
+
+        self._tile_values = {
+            (objective_type, key_bracket): to_tile_vector(tile_values) + key_delta
+            for objective_type, tile_values in tile_values_per_objective_types.items()
+            for key_bracket, key_delta in enumerate(key_deltas)
+        }
+
+    def find_tile_values(self, objective_type: ObjectiveType | None, status: Status = Status()) -> np.ndarray:
+        key_bracket = bisect_right(self._minimal_key_quantities, status.key_quantity)
+        tile_values = self._tile_values.get((objective_type, key_bracket))
+        return tile_values if tile_values is not None else self._tile_values[(None, key_bracket)]
+
+
+# Only source of the tile values, configuration files only adjust them
+DEFAULT_TILE_VALUES_PER_OBJECTIVE_TYPES: Dict[ObjectiveType | None, Dict[TileType, float]] = {**TILE_VALUES_PER_OBJECTIVE_TYPES, None: NO_OBJECTIVE_TILE_VALUES}
+
+DEFAULT_SCORING_PROFILES = ScoringProfiles(DEFAULT_TILE_VALUES_PER_OBJECTIVE_TYPES)
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from math import sqrt
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Point:
     x: int
     y: int
@@ -32,7 +32,21 @@ class Point:
         return int(sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2))
 
 
-@dataclass(frozen=True)
+BOARD_SIZE_X = 8
+BOARD_SIZE_Y = 7
+BOARD_SIZE = Point(BOARD_SIZE_X, BOARD_SIZE_Y)
+
+# Flyweights of every position of the board, simulations reuse them instead of allocating new points
+_BOARD_POINTS = [[Point(x, y) for x in range(BOARD_SIZE_X)] for y in range(BOARD_SIZE_Y)]
+
+
+def board_point(x: int, y: int) -> Point:
+    if 0 <= x < BOARD_SIZE_X and 0 <= y < BOARD_SIZE_Y:
+        return _BOARD_POINTS[y][x]
+    return Point(x, y)
+
+
+@dataclass(frozen=True, slots=True)
 class ScreenSquare:
     left: int = 0
     top: int = 0
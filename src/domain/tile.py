@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from enum import Enum, auto
 from typing import Sized, Iterable, FrozenSet, Set
 
-from src.domain.screen import Point
+from src.domain.screen import Point, BOARD_SIZE_X, BOARD_SIZE_Y, board_point
 
 
 class TileType(Enum):
@@ -20,7 +20,11 @@ class TileType(Enum):
         return self.name
 
 
-@dataclass(frozen=True)
+TILE_TYPES = list(TileType)
+TILE_TYPE_INDICES = {tile_type: index for index, tile_type in enumerate(TILE_TYPES)}
+
+
+@dataclass(frozen=True, slots=True)
 class Tile:
     type: TileType
     grid_position: Point
@@ -32,7 +36,17 @@ class Tile:
         return f"{{{str(self.type)} {str(self.grid_position)}}}"
 
 
-@dataclass(frozen=True)
+# Flyweights of every tile type at every position of the board
+_BOARD_TILES = {tile_type: [[Tile(tile_type, board_point(x, y)) for x in range(BOARD_SIZE_X)] for y in range(BOARD_SIZE_Y)] for tile_type in TileType}
+
+
+def board_tile(tile_type: TileType, grid_position: Point) -> Tile:
+    if 0 <= grid_position.x < BOARD_SIZE_X and 0 <= grid_position.y < BOARD_SIZE_Y:
+        return _BOARD_TILES[tile_type][grid_position.y][grid_position.x]
+    return Tile(tile_type, grid_position)
+
+
+@dataclass(frozen=True, slots=True)
 class Cluster(Sized, Iterable[Tile]):
     type: TileType
     tiles: FrozenSet[Tile]
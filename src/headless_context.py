@@ -0,0 +1,36 @@
+import logging
+from threading import Thread
+
+from src import bot, properties, startup
+from src.command import Stop
+from src.infra.status_server import StatusServer
+
+logger = logging.getLogger(__name__)
+
+
+class HeadlessContext:
+    """Runs the bot without any window. The game state is observed and the bot is controlled through the local status server."""
+
+    def __init__(self) -> None:
+        logger.info("Initializing headless context.")
+        startup.prepare_detection()
+
+        self.bot_thread = Thread(target=bot.main_loop)
+        self.status_server = StatusServer(properties.STATUS_SERVER_PORT)
+
+    def start(self):
+        logger.info("Starting headless context.")
+
+        self.status_server.start()
+        startup.mark("status server")
+        self.bot_thread.start()
+        try:
+            self.bot_thread.join()
+        except KeyboardInterrupt:
+            self.stop()
+            self.bot_thread.join()
+        finally:
+            self.status_server.stop()
+
+    def stop(self):
+        bot.send_command(Stop())
@@ -0,0 +1,49 @@
+import logging
+from typing import Hashable
+
+from src import properties
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class IdleGovernor:
+    """
+    Slows detection down while there is no move to play, like on menus or loading screens.
+    While idle, only a few probe pixels are sampled. Full detection resumes as soon as they change, and at least once per maximum delay.
+    Delays double from the initial delay up to the maximum delay, and go back to full rate once a move is played.
+    """
+
+    def __init__(self, initial_delay: float | None = None, maximum_delay: float | None = None) -> None:
+        self.initial_delay = initial_delay if initial_delay is not None else properties.IDLE_INITIAL_DELAY_SECONDS
+        self.maximum_delay = maximum_delay if maximum_delay is not None else properties.IDLE_MAXIMUM_DELAY_SECONDS
+        self.delay = 0.0
+        self.probes: Hashable | None = None
+
+    @property
+    def idle(self) -> bool:
+        return self.delay > 0
+
+    def should_detect(self, probes: Hashable | None) -> bool:
+        """Probes can not always be sampled, like when the window is gone. Detection then decides."""
+        if not self.idle or probes is None or self.delay >= self.maximum_delay:
+            return True
+
+        if probes != self.probes:
+            logger.info("Probes changed, resuming detection.")
+            self.delay = 0.0
+            return True
+
+        return False
+
+    def wait(self, probes: Hashable | None) -> float:
+        """Seconds to wait before sampling the probes again, while nothing changed since they were sampled."""
+        if self.delay == 0:
+            logger.info("No move to play, slowing detection down.")
+        self.delay = min(self.maximum_delay, self.delay * 2 if self.idle else self.initial_delay)
+        self.probes = probes
+        return self.delay
+
+    def wake(self) -> None:
+        self.delay = 0.0
+        self.probes = None
@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from typing import FrozenSet, List, Tuple
+
+from src.domain.screen import Point, ScreenSquare, board_point
+from src.infra.frame import Frame
+
+TILE_DIMENSION = 86
+
+# Distance to the lattice under which a detected tile is considered aligned with the other tiles
+LATTICE_TOLERANCE = TILE_DIMENSION // 8
+
+# Anchors are read this far outside of the board, on its frame, which does not change while playing
+PROBE_MARGIN = 6
+PROBE_TOLERANCE = 16
+
+
+@dataclass(frozen=True, slots=True)
+class AnchorProbe:
+    # Screen position of the pixel, and its grayscale intensity when calibrated
+    position: Point
+    intensity: int
+
+
+@dataclass(frozen=True, slots=True)
+class GridCalibration:
+    """Screen position of the top left tile of the grid, with the anchors telling whether it still holds."""
+
+    origin: Point
+    aligned_tile_quantity: int = 0
+    probes: Tuple[AnchorProbe, ...] = ()
+
+    def holds(self, frame: Frame) -> bool:
+        """True when every anchor pixel of the frame still has its calibrated intensity."""
+        if not self.probes:
+            return False
+
+        for probe in self.probes:
+            intensity = _read_intensity(frame, probe.position)
+            if intensity is None or abs(intensity - probe.intensity) > PROBE_TOLERANCE:
+                return False
+        return True
+
+
+def screen_to_grid(screen_square: ScreenSquare, calibration: GridCalibration) -> Point:
+    return board_point(
+        round((screen_square.left - calibration.origin.x) / TILE_DIMENSION),
+        round((screen_square.top - calibration.origin.y) / TILE_DIMENSION),
+    )
+
+
+def grid_to_screen(point: Point, calibration: GridCalibration) -> ScreenSquare:
+    return ScreenSquare(calibration.origin.x + point.x * TILE_DIMENSION, calibration.origin.y + point.y * TILE_DIMENSION, TILE_DIMENSION, TILE_DIMENSION)
+
+
+def calibrate(screen_squares: List[ScreenSquare], grid_size: Point, frame: Frame) -> GridCalibration:
+    """
+    Origin of the lattice most detected tiles are on. Unlike the leftmost and topmost detected tiles, a misdetected tile does not move it.
+    Anchors are read around the board of the frame, where they exist.
+    """
+    left, aligned_lefts = _find_lattice_origin([square.left for square in screen_squares])
+    top, aligned_tops = _find_lattice_origin([square.top for square in screen_squares])
+    origin = Point(int(left), int(top))
+
+    right = left + grid_size.x * TILE_DIMENSION
+    bottom = top + grid_size.y * TILE_DIMENSION
+    anchors = [
+        Point(left - PROBE_MARGIN, top - PROBE_MARGIN),
+        Point((left + right) // 2, top - PROBE_MARGIN),
+        Point(right + PROBE_MARGIN, top - PROBE_MARGIN),
+        Point(left - PROBE_MARGIN, bottom + PROBE_MARGIN),
+        Point((left + right) // 2, bottom + PROBE_MARGIN),
+        Point(right + PROBE_MARGIN, bottom + PROBE_MARGIN),
+    ]
+    probes = tuple(AnchorProbe(anchor, intensity) for anchor in anchors if (intensity := _read_intensity(frame, anchor)) is not None)
+
+    aligned_tile_quantity = sum(1 for square in screen_squares if square.left in aligned_lefts and square.top in aligned_tops)
+    return GridCalibration(origin, aligned_tile_quantity, probes)
+
+
+def _find_lattice_origin(coordinates: List[int]) -> Tuple[int, FrozenSet[int]]:
+    """Smallest of the coordinates on the lattice most coordinates sit on, with those coordinates."""
+    best_aligned: List[int] = []
+    for candidate in sorted(set(coordinates)):
+        aligned = [coordinate for coordinate in coordinates if _distance_to_lattice(coordinate, candidate) <= LATTICE_TOLERANCE]
+        if len(aligned) > len(best_aligned):
+            best_aligned = aligned
+
+    return min(best_aligned), frozenset(best_aligned)
+
+
+def _distance_to_lattice(coordinate: int, lattice_coordinate: int) -> int:
+    return abs((coordinate - lattice_coordinate + TILE_DIMENSION // 2) % TILE_DIMENSION - TILE_DIMENSION // 2)
+
+
+def _read_intensity(frame: Frame, position: Point) -> int | None:
+    x = position.x - frame.offset.x
+    y = position.y - frame.offset.y
+    if not (0 <= x < frame.gray.shape[1] and 0 <= y < frame.gray.shape[0]):
+        return None
+
+    return int(frame.gray[y, x])
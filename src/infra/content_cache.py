@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Generic, Hashable, TypeVar
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+V = TypeVar("V")
+
+# 128 bits, collisions between screenshots regions are not a concern
+DIGEST_SIZE = 16
+
+
+def content_key(pixels: np.ndarray, *salt: Hashable) -> bytes:
+    """Hash of the pixels, with whatever else the cached value depends on."""
+    digest = hashlib.blake2b(np.ascontiguousarray(pixels).data, digest_size=DIGEST_SIZE)
+    digest.update(repr((pixels.shape, *salt)).encode())
+    return digest.digest()
+
+
+class ContentCache(Generic[V]):
+    """
+    Bounded cache of what was detected in screenshot regions, keyed by the hash of their pixels.
+    The least recently used entries are dropped first. Shared by every game window, so access is locked.
+    Any hashable key can be used, only caches keyed by content can be saved.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.entries: OrderedDict[Hashable, V] = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> V | None:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def save(self, path: str, serialize: Callable[[V], str]) -> None:
+        with self.lock:
+            serialized_entries = {key.hex(): serialize(value) for key, value in self.entries.items()}
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(serialized_entries, file)
+        logger.info(f"Saved {len(serialized_entries)} cache entries to {path}.")
+
+    def load(self, path: str, deserialize: Callable[[str], V]) -> None:
+        """Entries which can not be read anymore, like removed tile types, are skipped."""
+        if not Path(path).exists():
+            return
+
+        with open(path) as file:
+            serialized_entries = json.load(file)
+
+        for key, serialized_value in serialized_entries.items():
+            try:
+                self.put(bytes.fromhex(key), deserialize(serialized_value))
+            except (KeyError, ValueError):
+                logger.debug(f"Skipping unreadable cache entry {key}.")
+        logger.info(f"Loaded {len(self)} cache entries from {path}.")
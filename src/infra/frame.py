@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import cv2
+import numpy as np
+from PIL import Image as PilImage
+from PIL.Image import Image
+
+from src.domain.screen import Point
+
+# Left, top, right and bottom of a region, relative to the window
+Box = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class Frame:
+    """
+    One screenshot of a game window, converted to grayscale once. Every matcher reads its regions from it.
+    Regions are views over the grayscale screenshot, nothing is copied. Parts of a region outside the screenshot are left out.
+    """
+
+    screenshot: Image
+    gray: np.ndarray
+    # Screen position of the top left pixel of the screenshot
+    offset: Point = Point(0, 0)
+
+    @staticmethod
+    def of(screenshot: Image, offset: Point = Point(0, 0)) -> Frame:
+        # Same conversion as pyscreeze does on every grayscale locate
+        return Frame(screenshot, cv2.cvtColor(np.asarray(screenshot.convert("RGB")), cv2.COLOR_RGB2GRAY), offset)
+
+    @staticmethod
+    def open(path: str, offset: Point = Point(0, 0)) -> Frame:
+        return Frame.of(PilImage.open(path), offset)
+
+    def region(self, box: Box) -> np.ndarray:
+        left, top, right, bottom = box
+        return self.gray[max(0, top) : max(0, bottom), max(0, left) : max(0, right)]
+
+    def region_offset(self, box: Box) -> Point:
+        """Screen position of the top left pixel of the region."""
+        return Point(self.offset.x + max(0, box[0]), self.offset.y + max(0, box[1]))
@@ -0,0 +1,192 @@
+import abc
+import logging
+from dataclasses import dataclass
+from enum import Enum, auto
+from threading import Lock
+from time import sleep
+from typing import List, Mapping, Sequence, Tuple
+
+from frozendict import frozendict
+
+from src import properties
+from src.domain.screen import Point
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class InputEventType(Enum):
+    MOVE = auto()
+    PRESS = auto()
+    RELEASE = auto()
+
+
+@dataclass(frozen=True, slots=True)
+class InputEvent:
+    type: InputEventType
+    position: Point
+    # Seconds to wait once the event is sent, before sending the next one
+    delay: float = 0.0
+
+
+# Time for the line to follow the cursor, by shift distance in tiles
+SECONDS_PER_TILE_DISTANCE = frozendict(
+    {
+        1: 0.11,
+        2: 0.25,
+        3: 0.37,
+        4: 0.48,
+        5: 0.50,
+        6: 0.50,
+        7: 0.50,
+        8: 0.50,
+    }
+)
+
+
+@dataclass(frozen=True)
+class DragTiming:
+    """
+    Every wait of a drag, nothing else is added by the backend.
+    The game needs the press to register before the cursor moves, and the cursor to move slow enough for the line to follow it.
+    """
+
+    press_seconds: float = 0.02
+    move_seconds: Mapping[int, float] = SECONDS_PER_TILE_DISTANCE
+    steps_per_tile: int = 4
+    release_seconds: float = 0.02
+
+
+DEFAULT_DRAG_TIMING = DragTiming()
+
+
+def plan_drag(start: Point, end: Point, tile_distance: int, timing: DragTiming = DEFAULT_DRAG_TIMING) -> Tuple[InputEvent, ...]:
+    """The whole drag, with the cursor moved in straight steps evenly spread over the move duration."""
+    steps = max(1, tile_distance * timing.steps_per_tile)
+    step_seconds = timing.move_seconds[tile_distance] / steps if tile_distance in timing.move_seconds else 0.0
+    moves = [
+        InputEvent(InputEventType.MOVE, Point(start.x + (end.x - start.x) * step // steps, start.y + (end.y - start.y) * step // steps), step_seconds)
+        for step in range(1, steps + 1)
+    ]
+    return (
+        InputEvent(InputEventType.MOVE, start),
+        InputEvent(InputEventType.PRESS, start, timing.press_seconds),
+        *moves[:-1],
+        InputEvent(InputEventType.MOVE, end, step_seconds + timing.release_seconds),
+        InputEvent(InputEventType.RELEASE, end),
+    )
+
+
+def plan_click(point: Point) -> Tuple[InputEvent, ...]:
+    return InputEvent(InputEventType.MOVE, point), InputEvent(InputEventType.PRESS, point), InputEvent(InputEventType.RELEASE, point)
+
+
+class InputBackend(metaclass=abc.ABCMeta):
+    def send(self, events: Sequence[InputEvent]) -> None:
+        for event in events:
+            self.send_event(event)
+            if event.delay > 0:
+                sleep(event.delay)
+
+    @abc.abstractmethod
+    def send_event(self, event: InputEvent) -> None:
+        raise NotImplementedError
+
+
+def is_in_corner(position: Point, screen_size: Point) -> bool:
+    return position.x in (0, screen_size.x - 1) and position.y in (0, screen_size.y - 1)
+
+
+class Win32InputBackend(InputBackend):
+    """
+    Sends events straight to Windows, without any pause between them.
+    Keeps the pyautogui fail-safe: moving the cursor to a screen corner aborts before the next event.
+    """
+
+    def __init__(self) -> None:
+        import pyautogui
+        import win32api
+        import win32con
+
+        self.pyautogui = pyautogui
+        self.win32api = win32api
+        self.screen_size = Point(win32api.GetSystemMetrics(win32con.SM_CXSCREEN), win32api.GetSystemMetrics(win32con.SM_CYSCREEN))
+        self.button_flags = {InputEventType.PRESS: win32con.MOUSEEVENTF_LEFTDOWN, InputEventType.RELEASE: win32con.MOUSEEVENTF_LEFTUP}
+
+    def send_event(self, event: InputEvent) -> None:
+        if self.pyautogui.FAILSAFE and is_in_corner(Point(*self.win32api.GetCursorPos()), self.screen_size):
+            raise self.pyautogui.FailSafeException("Fail-safe triggered from moving the mouse to a corner of the screen.")
+
+        if event.type is InputEventType.MOVE:
+            self.win32api.SetCursorPos((event.position.x, event.position.y))
+        else:
+            self.win32api.mouse_event(self.button_flags[event.type], 0, 0)
+
+
+class PyautoguiInputBackend(InputBackend):
+    """Portable, with the pyautogui pause disabled on every call."""
+
+    def __init__(self) -> None:
+        import pyautogui
+
+        self.pyautogui = pyautogui
+
+    def send_event(self, event: InputEvent) -> None:
+        if event.type is InputEventType.MOVE:
+            self.pyautogui.moveTo(event.position.x, event.position.y, _pause=False)
+        elif event.type is InputEventType.PRESS:
+            self.pyautogui.mouseDown(event.position.x, event.position.y, _pause=False)
+        else:
+            self.pyautogui.mouseUp(event.position.x, event.position.y, _pause=False)
+
+
+class RecordingInputBackend(InputBackend):
+    """Records events instead of sending them, and never waits. Used to test input on any platform."""
+
+    def __init__(self) -> None:
+        self.events: List[InputEvent] = []
+
+    def send(self, events: Sequence[InputEvent]) -> None:
+        self.events.extend(events)
+
+    def send_event(self, event: InputEvent) -> None:
+        self.events.append(event)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return sum(event.delay for event in self.events)
+
+
+INPUT_BACKENDS = {
+    "win32": Win32InputBackend,
+    "pyautogui": PyautoguiInputBackend,
+    "recording": RecordingInputBackend,
+}
+
+_backend: InputBackend | None = None
+
+# Serializes input, so moves in different game windows never interleave
+_input_lock = Lock()
+
+
+def create_backend(name: str) -> InputBackend:
+    try:
+        return INPUT_BACKENDS[name]()
+    except ImportError as e:
+        logger.warning(f"Input backend {name} is not available, falling back to pyautogui. {e}")
+        return PyautoguiInputBackend()
+
+
+def set_backend(backend: InputBackend | None) -> None:
+    """None creates the configured backend again on the next input."""
+    global _backend
+    _backend = backend
+
+
+def send(events: Sequence[InputEvent]) -> None:
+    global _backend
+
+    with _input_lock:
+        if _backend is None:
+            _backend = create_backend(properties.INPUT_BACKEND)
+        _backend.send(events)
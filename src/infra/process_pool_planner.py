@@ -0,0 +1,51 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from time import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.domain.grid import Grid
+from src.domain.lookahead import Planner, encode_grid, encode_shift, evaluate_follow_up
+from src.domain.objective import TileMove
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class ProcessPoolPlanner(Planner):
+    """
+    Fans the root moves out to worker processes, which are kept between frames so they only start once.
+    Scores are gathered until the deadline. Moves still waiting for a worker are cancelled, running ones stop by themselves at the deadline.
+    Follow-ups are only returned when every move was completely evaluated.
+    """
+
+    def __init__(self, depth: int, deadline_seconds: float, workers: int | None = None) -> None:
+        self.depth = depth
+        self.deadline_seconds = deadline_seconds
+        self.executor = ProcessPoolExecutor(max_workers=workers or max(1, (os.cpu_count() or 2) - 1))
+
+    def evaluate_follow_ups(self, grid: Grid, moves: List[TileMove], tile_values: np.ndarray) -> Dict[TileMove, float]:
+        deadline = time() + self.deadline_seconds
+        encoded_grid = encode_grid(grid)
+        encoded_tile_values = tuple(float(value) for value in tile_values)
+
+        futures = {
+            self.executor.submit(evaluate_follow_up, encoded_grid, encode_shift(move), encoded_tile_values, self.depth, deadline): move for move in moves
+        }
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time()))
+        for future in not_done:
+            future.cancel()
+
+        follow_up_scores = {futures[future]: future.result() for future in done if future.exception() is None}
+        evaluated_quantity = sum(score is not None for score in follow_up_scores.values())
+        if evaluated_quantity < len(futures):
+            # Moves are only compared on searches of the same depth, otherwise follow-ups count for none of them
+            logger.info(f"Evaluated {evaluated_quantity} of {len(futures)} moves before the deadline. Ignoring follow-ups.")
+            return {}
+
+        return follow_up_scores
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
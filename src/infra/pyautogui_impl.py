@@ -1,11 +1,17 @@
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from functools import reduce, singledispatch
 from pathlib import Path
-from typing import List, Tuple, FrozenSet
+from threading import Lock
+from time import sleep
+from typing import List, Tuple, FrozenSet, Dict, Set, Sequence
 
+import cv2
+import numpy as np
 import pyautogui
 import pyscreeze
 import win32gui
@@ -15,9 +21,16 @@ from src import properties
 from src.domain.game_state import GameState
 from src.domain.grid import Grid, InconsistentGrid, EmptyGrid
 from src.domain.item import Item, ItemType
-from src.domain.objective import Objective, ObjectiveType, TileMove, ItemMove, Move
-from src.domain.screen import ScreenSquare, Point
-from src.domain.tile import TileType, Tile
+from src.domain.item_planner import TILE_TRANSFORMATIONS
+from src.domain.objective import Objective, ObjectiveType, TileMove, ItemMove, ChainedMove, Move
+from src.domain.move_verification import ExpectedLine, MoveOutcome
+from src.domain.screen import ScreenSquare, Point, board_point, BOARD_SIZE, BOARD_SIZE_X, BOARD_SIZE_Y
+from src.domain.tile import TileType, Tile, board_tile
+from src.infra.calibration import TILE_DIMENSION, GridCalibration, calibrate, screen_to_grid, grid_to_screen
+from src.infra.content_cache import ContentCache, content_key
+from src.infra import input_backend
+from src.infra.frame import Frame
+from src.infra.template_matching import DEFAULT_CONFIDENCE, Haystack, PyramidHaystack
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -38,7 +51,19 @@ TILE_ASSETS = {
     TileType.STAR: "assets/tiles/star.png",
 }
 
-TILE_DIMENSION = 86
+# Several of these can be owned at once, every one of them is found
+COUNTED_ITEM_TYPES = {ItemType.KEY}
+
+REPAIR_MARGIN = TILE_DIMENSION // 4
+REPAIR_CONFIDENCES = (0.999, 0.95, 0.9, 0.85, 0.8)
+# Cells no tile was detected in are often empty or animating, any tile would match them at a low confidence
+MISSING_TILE_CONFIDENCES = (0.999, 0.98)
+
+# Fractions of the window width and height where probe pixels are sampled while idle
+IDLE_PROBE_FRACTIONS = (0.25, 0.5, 0.75)
+
+# Above this many cells never seen, the whole grid is matched instead of each cell
+MAX_UNSEEN_CELLS = 12
 
 OBJETIVE_ASSETS = {
     ObjectiveType.ZOMBIE: "assets/objectives/zombie2.png",
@@ -89,21 +114,13 @@ ITEM_ASSETS = {
     ItemType.BLUE_ORB: "assets/items/blue-orb.png",
 }
 
-GRID_SIZE_X = 8
-GRID_SIZE_Y = 7
-GRID_SIZE = Point(GRID_SIZE_X, GRID_SIZE_Y)
 
+# Time for transformed tiles to combine and fall, before the board can be used again
+SECONDS_PER_TRANSFORMATION = 1.0
 
-SECONDS_PER_TILE_DISTANCE = {
-    1: 0.11,
-    2: 0.25,
-    3: 0.37,
-    4: 0.48,
-    5: 0.50,
-    6: 0.50,
-    7: 0.50,
-    8: 0.50,
-}
+# Time for the game to draw a shifted line after the drag is released, and captures of the line before a move is said to have missed
+SECONDS_BEFORE_MOVE_VERIFICATION = 0.03
+MOVE_VERIFICATION_CAPTURES = 2
 
 REAL_WINDOW_TITLE = "10000000"
 TESTING_WINDOW_TITLE = "Visionneuse de photos Windows"
@@ -111,16 +128,68 @@ EXCLUDED_WINDOWS_PATTERN = {r"10000000 - .+\.py"}
 GAME_WINDOW_TITLE = REAL_WINDOW_TITLE
 
 
-_grid_left = 0
-_grid_top = 0
+@dataclass
+class CaptureContext:
+    """
+    What detection and input know about one game window. Each game window has its own, so games can be detected in parallel.
+    Without a window handle, the window is found by its title. Without a calibration, the grid is located on the next frame.
+    """
+
+    window_title: str = GAME_WINDOW_TITLE
+    window_handle: int | None = None
+    # Bound to one of several game windows, so only ever played through its handle, never through its title shared with other windows
+    exclusive: bool = False
+    # Replaced as a whole, never modified, so a calibration read by another thread is always consistent
+    calibration: GridCalibration | None = None
+
+
+# Used when a single game is played
+_default_context = CaptureContext()
+
+# Handles of the game windows bound to exclusive contexts, so two contexts never play the same window
+_claimed_window_handles: Set[int] = set()
+_window_lock = Lock()
+
+# Assets are decoded once instead of on every locate, and shared by every game window. Written once preloaded.
+_templates: Dict[str, np.ndarray] = {}
+
+# What was detected in regions already seen, by hash of their pixels. Cells only depend on the artwork, so they can be kept between sessions.
+_cell_cache: ContentCache[TileType] = ContentCache(properties.CELL_CACHE_CAPACITY)
+_objective_cache: ContentCache[Objective] = ContentCache(properties.REGION_CACHE_CAPACITY)
+_items_cache: ContentCache[FrozenSet[Item]] = ContentCache(properties.REGION_CACHE_CAPACITY)
+
 
+def read_template(asset: str) -> np.ndarray:
+    """Grayscale, as all templates are located in grayscale."""
+    template = cv2.imread(asset, cv2.IMREAD_GRAYSCALE)
+    if template is None:
+        raise IOError(f"Failed to read template {asset}.")
+    return template
 
-def screen_to_grid(screen_square: ScreenSquare | pyscreeze.Box) -> Point:
-    return Point(round((screen_square.left - _grid_left) / TILE_DIMENSION), round((screen_square.top - _grid_top) / TILE_DIMENSION))
 
+def load_template(asset: str) -> np.ndarray:
+    template = _templates.get(asset)
+    if template is None:
+        template = _templates[asset] = read_template(asset)
+    return template
 
-def grid_to_screen(point: Point) -> ScreenSquare:
-    return ScreenSquare(_grid_left + point.x * TILE_DIMENSION, _grid_top + point.y * TILE_DIMENSION, TILE_DIMENSION, TILE_DIMENSION)
+
+def preload_templates() -> None:
+    assets = [*TILE_ASSETS.values(), *OBJETIVE_ASSETS.values(), *ITEM_ASSETS.values()]
+    with ThreadPoolExecutor() as executor:
+        # Decoding releases the GIL, so templates load in parallel
+        _templates.update(zip(assets, executor.map(read_template, assets)))
+    logger.info(f"Preloaded {len(assets)} templates.")
+
+
+def load_cell_cache() -> None:
+    if properties.CELL_CACHE_PATH is not None:
+        _cell_cache.load(properties.CELL_CACHE_PATH, lambda name: TileType[name])
+
+
+def save_cell_cache() -> None:
+    if properties.CELL_CACHE_PATH is not None:
+        _cell_cache.save(properties.CELL_CACHE_PATH, lambda tile_type: tile_type.name)
 
 
 def activate_window(title):
@@ -138,18 +207,71 @@ def activate_window(title):
         logger.warning(e)
 
 
-def find_window_region(title) -> pyscreeze.Box | None:
-    # activate_window(title)
-
+def discover_window(context: CaptureContext = _default_context) -> int | None:
+    """Enumerating windows is slow, so the handle of the game window is kept in the context until the window is closed."""
+    title = context.window_title
     possible_game_windows = [window.title for window in pyautogui.getWindowsWithTitle(title)]
     logger.info(f"Found {len(possible_game_windows)} possible game windows: {possible_game_windows}.")
+    if not possible_game_windows:
+        return None
 
     actual_game_window = title if title in possible_game_windows else possible_game_windows[0]
     if True in {re.match(pattern, actual_game_window) for pattern in EXCLUDED_WINDOWS_PATTERN}:
         return None
 
     try:
-        window_handle = win32gui.FindWindow(None, actual_game_window)
+        context.window_handle = win32gui.FindWindow(None, actual_game_window) or None
+    except Exception as e:
+        context.window_handle = None
+
+    return context.window_handle
+
+
+def find_window_handles(title: str) -> List[int]:
+    """Handles of the visible windows with exactly this title, from the public win32 API rather than the internals of pygetwindow."""
+    handles = []
+
+    def collect(handle: int, _) -> None:
+        if win32gui.IsWindowVisible(handle) and win32gui.GetWindowText(handle) == title:
+            handles.append(handle)
+
+    win32gui.EnumWindows(collect, None)
+    return handles
+
+
+def discover_game_windows(title: str = GAME_WINDOW_TITLE) -> List[CaptureContext]:
+    """One exclusive context per opened game window. Windows sharing the same title are told apart by their handle."""
+    game_window_handles = find_window_handles(title)
+    logger.info(f"Found {len(game_window_handles)} game windows.")
+    with _window_lock:
+        _claimed_window_handles.update(game_window_handles)
+    return [CaptureContext(title, handle, exclusive=True) for handle in game_window_handles]
+
+
+def rebind_window(context: CaptureContext) -> int | None:
+    """Binds an exclusive context whose window was closed to a game window no other context plays. None when there is none left."""
+    with _window_lock:
+        _claimed_window_handles.discard(context.window_handle)
+        unclaimed_handles = [handle for handle in find_window_handles(context.window_title) if handle not in _claimed_window_handles]
+        context.window_handle = unclaimed_handles[0] if unclaimed_handles else None
+        if context.window_handle is not None:
+            _claimed_window_handles.add(context.window_handle)
+
+    logger.info(f"Game window {'rebound to ' + str(context.window_handle) if context.window_handle is not None else 'is gone'}.")
+    return context.window_handle
+
+
+def find_window_region(context: CaptureContext) -> pyscreeze.Box | None:
+    # activate_window(title)
+
+    if context.window_handle is not None and win32gui.IsWindow(context.window_handle):
+        window_handle = context.window_handle
+    else:
+        window_handle = rebind_window(context) if context.exclusive else discover_window(context)
+    if window_handle is None:
+        return None
+
+    try:
         win_region = win32gui.GetWindowRect(window_handle)
     except Exception as e:
         return None
@@ -157,8 +279,8 @@ def find_window_region(title) -> pyscreeze.Box | None:
     return pyscreeze.Box(win_region[0], win_region[1], win_region[2] - win_region[0], win_region[3] - win_region[1])
 
 
-def screenshot_window(window_title: str) -> Tuple[pyscreeze.Box, Image] | None:
-    region = find_window_region(window_title)
+def screenshot_window(context: CaptureContext) -> Tuple[pyscreeze.Box, Image] | None:
+    region = find_window_region(context)
     if region is None or region.left < 0:
         return None
 
@@ -169,63 +291,241 @@ def screenshot_window(window_title: str) -> Tuple[pyscreeze.Box, Image] | None:
     return region, screenshot
 
 
-def locate_all_on_window(needle_image, offset: Point, screenshot: Image, **kwargs) -> List[pyscreeze.Box]:
-    return [pyscreeze.Box(box.left + offset.x, box.top + offset.y, box.width, box.height) for box in pyautogui.locateAll(needle_image, screenshot, **kwargs)]
-
+def sample_probes(context: CaptureContext | None = None) -> Tuple[Tuple[int, int, int], ...] | None:
+    """A few pixels spread over the game window, much cheaper than a screenshot. None when the window can not be sampled."""
+    region = find_window_region(context if context is not None else _default_context)
+    if region is None or region.left < 0:
+        return None
 
-def locate_on_window(needle_image, offset: Point, screenshot: Image, **kwargs) -> pyscreeze.Box:
-    box = pyautogui.locate(needle_image, screenshot, **kwargs)
-    return pyscreeze.Box(box.left + offset.x, box.top + offset.y, box.width, box.height) if box is not None else None
+    try:
+        return tuple(
+            tuple(pyautogui.pixel(region.left + int(region.width * x_fraction), region.top + int(region.height * y_fraction)))
+            for y_fraction in IDLE_PROBE_FRACTIONS
+            for x_fraction in IDLE_PROBE_FRACTIONS
+        )
+    except Exception as e:
+        logger.debug(f"Failed to sample probes: {e}")
+        return None
 
 
-def find_grid(offset: Point, screenshot: Image) -> Grid:
-    """Should detect 8x7 56 tiles."""
-    # TODO lower confidence and undupe images
+def locate_all_on_window(asset: str, offset: Point, haystack: Haystack, confidence: float = DEFAULT_CONFIDENCE) -> List[pyscreeze.Box]:
+    """Haystacks are grayscale regions of a frame, matched against every template of a family."""
+    template = load_template(asset)
+    height, width = template.shape
+    return [pyscreeze.Box(point.x + offset.x, point.y + offset.y, width, height) for point in haystack.locate_all(asset, template, confidence)]
+
+
+def locate_on_window(asset: str, offset: Point, haystack: Haystack | PyramidHaystack, confidence: float = DEFAULT_CONFIDENCE) -> pyscreeze.Box | None:
+    template = load_template(asset)
+    height, width = template.shape
+    point = haystack.locate(asset, template, confidence)
+    return pyscreeze.Box(point.x + offset.x, point.y + offset.y, width, height) if point is not None else None
+
+
+def find_grid(frame: Frame, context: CaptureContext | None = None) -> Grid:
+    """
+    Should detect 8x7 56 tiles.
+    The calibration of the context is kept while its anchors hold. Otherwise, the grid is located again from the detected tiles,
+    and the new calibration is kept once enough tiles agree on it.
+    While calibrated, cells already seen are classified from the cache, and templates are only matched when a cell was never seen.
+    """
+    context = context if context is not None else CaptureContext()
+    calibration = context.calibration
+    if calibration is not None and not calibration.holds(frame):
+        logger.info("Grid calibration does not hold anymore. Locating the grid again.")
+        calibration = context.calibration = None
+
+    if calibration is not None:
+        cached_grid = find_cached_grid(frame, calibration)
+        if cached_grid is not None:
+            return cached_grid
+
+    grid_haystack = Haystack(frame.region(GRID_BOX))
+    grid_offset = frame.region_offset(GRID_BOX)
     prospect_tiles = [
         (tile_type, ScreenSquare(tile.left, tile.top, tile.height, tile.width))
         for tile_type, asset in TILE_ASSETS.items()
-        for tile in locate_all_on_window(asset, Point(offset.x + GRID_BOX[0], offset.y + GRID_BOX[1]), screenshot.crop(GRID_BOX), grayscale=True)
+        for tile in locate_all_on_window(asset, grid_offset, grid_haystack)
     ]
 
     if not prospect_tiles:
         logger.warning(f"No tiles found. Returning EmptyGrid.")
         return EmptyGrid()
 
-    global _grid_left
-    global _grid_top
-
-    _grid_left = min(tile[1].left for tile in prospect_tiles)
-    _grid_top = min(tile[1].top for tile in prospect_tiles)
-
-    tiles = []
-    for tile in prospect_tiles:
-        screen_square = tile[1]
-        grid_position = screen_to_grid(screen_square)
-
-        # TODO instead of ignoring the tile, it should be recalculated (only between the found possibilities to speed up)
-        if grid_position not in {t.grid_position for t in tiles}:
-            tiles.append(Tile(tile[0], grid_position))
+    if calibration is None:
+        calibration = calibrate([screen_square for _, screen_square in prospect_tiles], BOARD_SIZE, frame)
+        logger.debug(f"Grid located at {calibration.origin}, {calibration.aligned_tile_quantity} tiles aligned.")
+        if calibration.aligned_tile_quantity >= properties.MIN_REPAIRABLE_TILE_QUANTITY:
+            context.calibration = calibration
+
+    types_per_position: Dict[Point, List[TileType]] = {}
+    for tile_type, screen_square in prospect_tiles:
+        grid_position = screen_to_grid(screen_square, calibration)
+        if not (0 <= grid_position.x < BOARD_SIZE_X and 0 <= grid_position.y < BOARD_SIZE_Y):
+            logger.debug(f"Ignoring {tile_type} detected out of the grid at {grid_position}.")
+            continue
+        types = types_per_position.setdefault(grid_position, [])
+        if tile_type not in types:
+            types.append(tile_type)
+
+    tiles = [board_tile(types[0], grid_position) for grid_position, types in types_per_position.items() if len(types) == 1]
+    if context.calibration is calibration:
+        # Only tiles matched without doubt are cached, repaired ones are matched again next time
+        for tile in tiles:
+            cell_key = _find_cell_key(frame, tile.grid_position, calibration)
+            if cell_key is not None:
+                _cell_cache.put(cell_key, tile.type)
+    conflicting_positions = {grid_position: types for grid_position, types in types_per_position.items() if len(types) > 1}
+    if conflicting_positions:
+        logger.debug(f"Found conflicting tiles at {[str(position) for position in conflicting_positions]}.")
+        tiles += [
+            repair_tile(frame, grid_position, types, calibration) or board_tile(types[0], grid_position)
+            for grid_position, types in conflicting_positions.items()
+        ]
+
+    missing_positions = InconsistentGrid(tiles, BOARD_SIZE).find_missing_positions()
+    if len(tiles) >= properties.MIN_REPAIRABLE_TILE_QUANTITY and missing_positions:
+        logger.debug(f"Repairing missing tiles at {[str(position) for position in missing_positions]}.")
+        repaired_tiles = [repair_tile(frame, grid_position, list(TILE_ASSETS), calibration, MISSING_TILE_CONFIDENCES) for grid_position in missing_positions]
+        tiles += [tile for tile in repaired_tiles if tile is not None]
 
     tiles = sorted(tiles, key=lambda tile: tile.grid_position)
 
     size_x = max(tile.grid_position.x for tile in tiles) + 1
     size_y = max(tile.grid_position.y for tile in tiles) + 1
     grid = InconsistentGrid(tiles, Point(size_x, size_y))
-    if size_x != GRID_SIZE_X or size_y != GRID_SIZE_Y:
-        logger.warning(f"Detected grid is {size_x} / {size_y}. Expected grid should be {GRID_SIZE_X} / {GRID_SIZE_Y}. Returning InconsistentGrid")
+    if size_x != BOARD_SIZE_X or size_y != BOARD_SIZE_Y:
+        logger.warning(f"Detected grid is {size_x} / {size_y}. Expected grid should be {BOARD_SIZE_X} / {BOARD_SIZE_Y}. Returning InconsistentGrid")
         return grid
 
     return grid
 
 
-def find_objective(offset: Point, screenshot: Image) -> Objective:
+def find_cached_grid(frame: Frame, calibration: GridCalibration) -> Grid | None:
+    """
+    Grid classified from the cache. The few cells never seen are matched alone, each against every tile template.
+    None when too many cells were never seen, matching the whole grid at once is then cheaper.
+    """
+    tile_types: Dict[Point, TileType | None] = {}
+    unseen_cells: Dict[Point, bytes] = {}
+    for y in range(BOARD_SIZE_Y):
+        for x in range(BOARD_SIZE_X):
+            grid_position = board_point(x, y)
+            cell_key = _find_cell_key(frame, grid_position, calibration)
+            if cell_key is None:
+                return None
+
+            tile_types[grid_position] = _cell_cache.get(cell_key)
+            if tile_types[grid_position] is None:
+                unseen_cells[grid_position] = cell_key
+
+    if len(unseen_cells) > MAX_UNSEEN_CELLS:
+        return None
+
+    for grid_position, cell_key in unseen_cells.items():
+        scores = _score_cell(frame, grid_position, list(TILE_ASSETS), calibration)
+        matching_types = [tile_type for tile_type, score in scores.items() if score > DEFAULT_CONFIDENCE]
+        if len(matching_types) == 1:
+            tile_types[grid_position] = matching_types[0]
+            _cell_cache.put(cell_key, matching_types[0])
+        else:
+            tile_types[grid_position] = (
+                _repair_from_scores(scores, matching_types) if matching_types else _repair_from_scores(scores, list(TILE_ASSETS), MISSING_TILE_CONFIDENCES)
+            )
+
+    logger.debug(f"Grid classified from cache, {len(unseen_cells)} cells matched.")
+    tiles = [board_tile(tile_type, grid_position) for grid_position, tile_type in tile_types.items() if tile_type is not None]
+    return InconsistentGrid(tiles, BOARD_SIZE)
+
+
+def find_line(frame: Frame, positions: Sequence[Point], calibration: GridCalibration) -> List[TileType]:
+    """Type of each tile of the line, UNKNOWN where no template matches without doubt, like in the middle of an animation."""
+    tile_types = []
+    for grid_position in positions:
+        cell_key = _find_cell_key(frame, grid_position, calibration)
+        tile_type = _cell_cache.get(cell_key) if cell_key is not None else None
+        if tile_type is None:
+            scores = _score_cell(frame, grid_position, list(TILE_ASSETS), calibration)
+            matching_types = [tile_type for tile_type, score in scores.items() if score > DEFAULT_CONFIDENCE]
+            if len(matching_types) == 1:
+                tile_type = matching_types[0]
+                if cell_key is not None:
+                    _cell_cache.put(cell_key, tile_type)
+        tile_types.append(tile_type if tile_type is not None else TileType.UNKNOWN)
+
+    return tile_types
+
+
+def _find_cell_key(frame: Frame, grid_position: Point, calibration: GridCalibration) -> bytes | None:
+    cell = grid_to_screen(grid_position, calibration)
+    left = cell.left - frame.offset.x
+    top = cell.top - frame.offset.y
+    if left < 0 or top < 0 or left + cell.width > frame.gray.shape[1] or top + cell.height > frame.gray.shape[0]:
+        return None
+    return content_key(frame.region((left, top, left + cell.width, top + cell.height)))
+
+
+def repair_tile(
+    frame: Frame, grid_position: Point, candidate_types: List[TileType], calibration: GridCalibration, confidences: Tuple[float, ...] = REPAIR_CONFIDENCES
+) -> Tile | None:
+    """
+    Re-classify a single cell between the given candidates, only looking around where the tile is expected on the lattice.
+    Confidence is lowered step by step so the best matching candidate wins.
+    """
+    tile_type = _repair_from_scores(_score_cell(frame, grid_position, candidate_types, calibration), candidate_types, confidences)
+    if tile_type is None:
+        return None
+
+    logger.debug(f"Repaired {grid_position} as {tile_type}.")
+    return board_tile(tile_type, grid_position)
+
+
+def _score_cell(frame: Frame, grid_position: Point, candidate_types: List[TileType], calibration: GridCalibration) -> Dict[TileType, float]:
+    """Best score of each candidate around where the tile is expected. Empty when the cell is not entirely in the frame."""
+    cell = grid_to_screen(grid_position, calibration)
+    left = cell.left - frame.offset.x - REPAIR_MARGIN
+    top = cell.top - frame.offset.y - REPAIR_MARGIN
+    cell_box = (left, top, left + cell.width + 2 * REPAIR_MARGIN, top + cell.height + 2 * REPAIR_MARGIN)
+    if cell_box[0] < 0 or cell_box[1] < 0 or cell_box[2] > frame.gray.shape[1] or cell_box[3] > frame.gray.shape[0]:
+        return {}
+
+    cell_haystack = Haystack(frame.region(cell_box))
+    return {tile_type: _best_score(cell_haystack.match(TILE_ASSETS[tile_type], load_template(TILE_ASSETS[tile_type]))) for tile_type in candidate_types}
+
+
+def _repair_from_scores(scores: Dict[TileType, float], candidate_types: List[TileType], confidences: Tuple[float, ...] = REPAIR_CONFIDENCES) -> TileType | None:
+    # Candidates are scored once, then compared to every confidence
+    for confidence in confidences:
+        for tile_type in candidate_types:
+            if scores.get(tile_type, 0.0) > confidence:
+                return tile_type
+
+    return None
+
+
+def _best_score(scores: np.ndarray) -> float:
+    return float(scores.max()) if scores.size else 0.0
+
+
+def find_objective(frame: Frame) -> Objective:
+    # Objectives hold their screen position, so the window position is part of the key
+    objectives_key = content_key(frame.region(OBJECTIVES_BOX), frame.offset)
+    objective = _objective_cache.get(objectives_key)
+    if objective is None:
+        objective = _match_objective(frame)
+        _objective_cache.put(objectives_key, objective)
+    return objective
+
+
+def _match_objective(frame: Frame) -> Objective:
     objectives = []
     logger.debug(f"Looking for objectives.")
 
+    # Only one objective is on screen, the pyramid skips most of the region early
+    objectives_haystack = PyramidHaystack(frame.region(OBJECTIVES_BOX))
+    objectives_offset = frame.region_offset(OBJECTIVES_BOX)
     for objective_assets, asset in OBJETIVE_ASSETS.items():
-        square = locate_on_window(
-            asset, Point(offset.x + OBJECTIVES_BOX[0], offset.y + OBJECTIVES_BOX[1]), screenshot.crop(OBJECTIVES_BOX), grayscale=True, confidence=0.85
-        )
+        square = locate_on_window(asset, objectives_offset, objectives_haystack, confidence=0.85)
         if square is not None:
             objectives.append(Objective(objective_assets, ScreenSquare(square.left, square.top, square.height, square.width)))
 
@@ -236,19 +536,42 @@ def find_objective(offset: Point, screenshot: Image) -> Objective:
     return sorted(objectives, key=lambda x: x.screen_square.left)[0]
 
 
-def find_items(offset: Point, screenshot: Image) -> FrozenSet[Item]:
+def find_items(frame: Frame) -> FrozenSet[Item]:
+    items_key = content_key(frame.region(ITEMS_BOX), frame.offset)
+    items = _items_cache.get(items_key)
+    if items is None:
+        items = _match_items(frame)
+        _items_cache.put(items_key, items)
+    return items
+
+
+def _match_items(frame: Frame) -> FrozenSet[Item]:
     items = []
     logger.debug(f"Looking for items.")
 
-    for item_assets, asset in ITEM_ASSETS.items():
-        square = locate_on_window(asset, Point(offset.x + ITEMS_BOX[0], offset.y + ITEMS_BOX[1]), screenshot.crop(ITEMS_BOX), grayscale=True)
-        if square is not None:
-            items.append(Item(item_assets, ScreenSquare(square.left, square.top, square.height, square.width)))
+    items_haystack = PyramidHaystack(frame.region(ITEMS_BOX))
+    items_offset = frame.region_offset(ITEMS_BOX)
+    for item_type, asset in ITEM_ASSETS.items():
+        if item_type in COUNTED_ITEM_TYPES:
+            squares = _distinct_squares(locate_all_on_window(asset, items_offset, items_haystack))
+        else:
+            square = locate_on_window(asset, items_offset, items_haystack)
+            squares = [square] if square is not None else []
+        items += [Item(item_type, ScreenSquare(square.left, square.top, square.height, square.width)) for square in squares]
 
     logger.info(f"Found items {[str(item) for item in items]}.")
     return frozenset(items)
 
 
+def _distinct_squares(squares: List[pyscreeze.Box]) -> List[pyscreeze.Box]:
+    """Matches around the same spot are the same item, only the first one is kept."""
+    distinct_squares = []
+    for square in squares:
+        if all(abs(square.left - kept.left) >= kept.width or abs(square.top - kept.top) >= kept.height for kept in distinct_squares):
+            distinct_squares.append(square)
+    return distinct_squares
+
+
 def log_screenshot(screenshot: Image):
     logs_folder = Path("logs")
     if not logs_folder.exists():
@@ -261,31 +584,69 @@ def log_screenshot(screenshot: Image):
         os.remove(Path(f"logs/{sorted(saved_screenshots)[0]}"))
 
 
-def detect_game_state() -> GameState:
-    packed_screenshot = screenshot_window(GAME_WINDOW_TITLE)
+def detect_game_state(context: CaptureContext | None = None) -> GameState:
+    context = context if context is not None else _default_context
+    packed_screenshot = screenshot_window(context)
     if packed_screenshot is None:
         return GameState(EmptyGrid(), Objective(), frozenset())
 
     region, screenshot = packed_screenshot
-    offset = Point(region.left, region.top)
-    found_grid = find_grid(offset, screenshot)
+    frame = Frame.of(screenshot, Point(region.left, region.top))
+    found_grid = find_grid(frame, context)
 
-    if len(found_grid) > 16 and GAME_WINDOW_TITLE == REAL_WINDOW_TITLE and properties.SCREENSHOT_LOGGING_ENABLED:
+    if len(found_grid) > 16 and context.window_title == REAL_WINDOW_TITLE and properties.SCREENSHOT_LOGGING_ENABLED:
         log_screenshot(screenshot)
 
-    return GameState(found_grid, find_objective(offset, screenshot), find_items(offset, screenshot))
+    return GameState(found_grid, find_objective(frame), find_items(frame))
+
+
+def capture_line(positions: Sequence[Point], calibration: GridCalibration) -> Frame:
+    """Screenshot of only the cells of a line, with the margin cells are matched in."""
+    cells = [grid_to_screen(grid_position, calibration) for grid_position in positions]
+    left = min(cell.left for cell in cells) - REPAIR_MARGIN
+    top = min(cell.top for cell in cells) - REPAIR_MARGIN
+    right = max(cell.left + cell.width for cell in cells) + REPAIR_MARGIN
+    bottom = max(cell.top + cell.height for cell in cells) + REPAIR_MARGIN
+    return Frame.of(pyautogui.screenshot(region=(left, top, right - left, bottom - top)), Point(left, top))
+
+
+def verify_move(grid: Grid, move: TileMove, context: CaptureContext | None = None) -> MoveOutcome:
+    """
+    Tells whether a tile move landed from the line it shifted only, captured right after the drag.
+    A miss is only reported once a second capture agrees, in case the game had not drawn the shift yet.
+    """
+    calibration = (context if context is not None else _default_context).calibration
+    if calibration is None or not grid.tiles or move.calculate_grid_distance() == 0:
+        return MoveOutcome.UNKNOWN
+
+    expected_line = ExpectedLine.of(grid, move)
+    outcome = MoveOutcome.UNKNOWN
+    for _ in range(MOVE_VERIFICATION_CAPTURES):
+        sleep(SECONDS_BEFORE_MOVE_VERIFICATION)
+        frame = capture_line(expected_line.positions, calibration)
+        outcome = expected_line.verify(find_line(frame, expected_line.positions, calibration))
+        if outcome is not MoveOutcome.MISSED:
+            break
+
+    logger.info(f"Move verified as {outcome}.")
+    return outcome
 
 
 @singledispatch
-def do_move(move: Move) -> float:
+def do_move(move: Move, context: CaptureContext | None = None) -> float:
     raise NotImplementedError(f"No implementation for {type(move)}")
 
 
 @do_move.register
-def _(move: TileMove) -> float:
+def _(move: TileMove, context: CaptureContext | None = None) -> float:
     if move.calculate_grid_distance() == 0:
         return 0
 
+    calibration = (context if context is not None else _default_context).calibration
+    if calibration is None:
+        logger.warning("Grid is not calibrated. Skipping move.")
+        return 0
+
     logger.info(
         f"Completing cluster {move.get_combo_type()} "
         + reduce(lambda x, y: x + y, (f"({tile.grid_position.x}, {tile.grid_position.y}) " for tile in move.cluster.tiles))
@@ -294,22 +655,32 @@ def _(move: TileMove) -> float:
     )
 
     shift = move.calculate_shift()
-    start_drag = grid_to_screen(shift[0]).find_center()
-    end_drag = grid_to_screen(shift[1]).find_center()
+    start_drag = grid_to_screen(shift[0], calibration).find_center()
+    end_drag = grid_to_screen(shift[1], calibration).find_center()
 
-    logger.debug(f"Starting drag from {start_drag}.")
-    pyautogui.moveTo(start_drag.x, start_drag.y)
-    logger.debug(f"Ending drag to {end_drag}.")
     grid_distance = move.calculate_shift_distance()
-    pyautogui.dragTo(end_drag.x, end_drag.y, duration=SECONDS_PER_TILE_DISTANCE[grid_distance])
+    logger.debug(f"Dragging from {start_drag} to {end_drag}.")
+    input_backend.send(input_backend.plan_drag(start_drag, end_drag, grid_distance))
 
     return 0.5
 
 
 @do_move.register
-def _(move: ItemMove) -> float:
+def _(move: ItemMove, context: CaptureContext | None = None) -> float:
     logger.info(f"Using item {move.item.type}.")
     click_point = move.item.screen_square.find_center()
-    pyautogui.click(click_point.x, click_point.y)
+    input_backend.send(input_backend.plan_click(click_point))
+
+    return SECONDS_PER_TRANSFORMATION if move.item.type in TILE_TRANSFORMATIONS else 0
 
-    return 0
+
+@do_move.register
+def _(move: ChainedMove, context: CaptureContext | None = None) -> float:
+    logger.info(f"Chaining {len(move.moves)} moves.")
+    delay = 0
+    for chained_move in move.moves:
+        # Other game windows can use the input while waiting
+        sleep(delay)
+        delay = do_move(chained_move, context)
+
+    return delay
@@ -0,0 +1,60 @@
+import json
+import logging
+from pathlib import Path
+from typing import Dict
+
+from src.domain.objective import ObjectiveType
+from src.domain.scoring_profile import ScoringProfiles, StatusModifiers, DEFAULT_SCORING_PROFILES, DEFAULT_TILE_VALUES_PER_OBJECTIVE_TYPES
+from src.domain.tile import TileType
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def load_scoring_profiles(path: str | Path, quest: str | None = None) -> ScoringProfiles:
+    """
+    Tile values are the defaults of the domain, the file only adjusts them. Expected format, every key being optional:
+    - "tile_values": tile values per objective type, merged tile by tile over the default values of the objective
+    - "default_tile_values": tile values merged over the default values used when there is no known objective
+    - "modifiers": deltas added to tile values per "key_quantity", starting from a "minimal_quantity"
+    - "quests": partial configurations per quest name, merged over the rest of the file when the quest is selected
+    """
+    path = Path(path)
+    if not path.exists():
+        logger.warning(f"No scoring profiles found at {path}. Using default tile values.")
+        return DEFAULT_SCORING_PROFILES
+
+    config = json.loads(path.read_text())
+    if quest is not None:
+        if quest not in config.get("quests", {}):
+            raise ValueError(f"Unknown quest {quest} in {path}.")
+        config = _merge(config, config["quests"][quest])
+
+    adjusted_tile_values = {ObjectiveType[objective_type]: tile_values for objective_type, tile_values in config.get("tile_values", {}).items()}
+    adjusted_tile_values[None] = config.get("default_tile_values", {})
+    tile_values_per_objective_types = {
+        objective_type: {**tile_values, **_to_tile_values(adjusted_tile_values.get(objective_type, {}))}
+        for objective_type, tile_values in DEFAULT_TILE_VALUES_PER_OBJECTIVE_TYPES.items()
+    }
+
+    modifiers = config.get("modifiers", {})
+    status_modifiers = StatusModifiers(
+        sorted(
+            ((key_modifier["minimal_quantity"], _to_tile_values(key_modifier["deltas"])) for key_modifier in modifiers.get("key_quantity", [])),
+            key=lambda key_modifier: key_modifier[0],
+        ),
+    )
+
+    logger.info(f"Loaded scoring profiles from {path}" + (f" for quest {quest}." if quest is not None else "."))
+    return ScoringProfiles(tile_values_per_objective_types, status_modifiers)
+
+
+def _to_tile_values(tile_values: Dict[str, float]) -> Dict[TileType, float]:
+    return {TileType[tile_type]: value for tile_type, value in tile_values.items()}
+
+
+def _merge(config: dict, override: dict) -> dict:
+    merged = dict(config)
+    for key, value in override.items():
+        merged[key] = _merge(config[key], value) if isinstance(value, dict) and isinstance(config.get(key), dict) else value
+    return merged
@@ -0,0 +1,166 @@
+import json
+import logging
+from dataclasses import asdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from queue import SimpleQueue, Empty
+from threading import Thread
+from typing import List
+
+from src import bot
+from src.command import SetProperty, Stop
+from src.snapshot import Snapshot
+from src.ui.model import to_game_state_model
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Type of the value of each property which can be set
+CONTROLLABLE_PROPERTIES = {"SCREENSHOT_LOGGING_ENABLED": bool, "MOVEMENT_ENABLED": bool, "AUTO_RUN_AGAIN_ENABLED": bool}
+
+KEEP_ALIVE_SECONDS = 15
+
+
+def to_json(snapshot: Snapshot) -> str:
+    return json.dumps(
+        {
+            "version": snapshot.version,
+            "game_state": asdict(to_game_state_model(snapshot.game_state, snapshot.packed_move)),
+            "timings": dict(snapshot.timings),
+        },
+        default=str,
+    )
+
+
+def instances_to_json(instances: List[bot.BotInstance]) -> str:
+    """Latest snapshot of every played game window, each with the handle of its window."""
+    return "[" + ",".join(_instance_to_json(instance) for instance in instances) + "]"
+
+
+def _instance_to_json(instance: bot.BotInstance) -> str:
+    window_handle = instance.capture_context.window_handle if instance.capture_context is not None else None
+    return f'{{"window_handle": {json.dumps(window_handle)}, "snapshot": {to_json(instance.channel.latest())}}}'
+
+
+def find_properties_error(properties: object) -> str | None:
+    """Why the properties can not be set, or None when all of them can."""
+    if not isinstance(properties, dict):
+        return "Properties must be a JSON object."
+
+    unknown_properties = set(properties) - set(CONTROLLABLE_PROPERTIES)
+    if unknown_properties:
+        return f"Properties {sorted(unknown_properties)} can not be set."
+
+    mistyped_properties = [name for name, value in properties.items() if not isinstance(value, CONTROLLABLE_PROPERTIES[name])]
+    if mistyped_properties:
+        return f"Properties {sorted(mistyped_properties)} have values of the wrong type."
+
+    return None
+
+
+class StatusRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /status: latest snapshot
+    GET /instances: latest snapshot of every played game window
+    GET /events: stream of snapshots, as server-sent events, every time the game state changes
+    POST /properties: JSON object of properties to set, e.g. {"MOVEMENT_ENABLED": false}
+    POST /stop: stop the bot
+    """
+
+    def do_GET(self) -> None:
+        if self.path == "/status":
+            self._send_json(200, to_json(bot.channel.latest()))
+        elif self.path == "/instances":
+            self._send_json(200, instances_to_json(bot.instances))
+        elif self.path == "/events":
+            self._stream_events()
+        else:
+            self._send_json(404, json.dumps({"error": f"Unknown path {self.path}."}))
+
+    def do_POST(self) -> None:
+        if self.path == "/properties":
+            self._set_properties()
+        elif self.path == "/stop":
+            bot.send_command(Stop())
+            self._send_json(202, json.dumps({}))
+        else:
+            self._send_json(404, json.dumps({"error": f"Unknown path {self.path}."}))
+
+    def _set_properties(self) -> None:
+        try:
+            properties = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError as e:
+            self._send_json(400, json.dumps({"error": str(e)}))
+            return
+
+        error = find_properties_error(properties)
+        if error is not None:
+            self._send_json(400, json.dumps({"error": error}))
+            return
+
+        for name, value in properties.items():
+            bot.send_command(SetProperty(name, value))
+        self._send_json(202, json.dumps(properties))
+
+    def _stream_events(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        # Notified from the bot thread, which must never wait on a slow client.
+        notifications = SimpleQueue()
+        listener = lambda: notifications.put(None)
+        bot.channel.subscribe(listener)
+        try:
+            self._write_event(to_json(bot.channel.latest()))
+            while True:
+                try:
+                    notifications.get(timeout=KEEP_ALIVE_SECONDS)
+                except Empty:
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+                    continue
+
+                while not notifications.empty():
+                    notifications.get_nowait()
+                self._write_event(to_json(bot.channel.latest()))
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("Event stream closed by client.")
+        finally:
+            bot.channel.unsubscribe(listener)
+
+    def _write_event(self, data: str) -> None:
+        self.wfile.write(f"data: {data}\n\n".encode())
+        self.wfile.flush()
+
+    def _send_json(self, status: int, body: str) -> None:
+        encoded_body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded_body)))
+        self.end_headers()
+        self.wfile.write(encoded_body)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+
+class StatusServer:
+    """
+    Only listens on loopback, so it is reachable from the machine running the bot and nowhere else.
+    Port 0 picks any free port, which is logged once the server starts.
+    """
+
+    def __init__(self, port: int) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), StatusRequestHandler)
+        self.server.daemon_threads = True
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self) -> None:
+        logger.info(f"Serving status on http://127.0.0.1:{self.server.server_address[1]}.")
+        self.thread.start()
+
+    def stop(self) -> None:
+        logger.info("Stopping status server.")
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from typing import Dict, Hashable, List, Tuple
+
+import cv2
+import numpy as np
+
+from src.domain.screen import Point
+from src.infra.content_cache import ContentCache
+
+# Same default as pyscreeze
+DEFAULT_CONFIDENCE = 0.999
+MATCH_LIMIT = 10000
+
+# Scores computed in single precision are this close to the exact ones
+CANDIDATE_MARGIN = 1e-3
+
+# Pyramid matchers look for candidates on regions and templates downscaled by this factor
+PYRAMID_SCALE = 2
+# Downscaling blurs the artwork, so candidates only need a fraction of the confidence. Matches of the fixtures score at least 0.8 of it.
+# The best coarse position is always a candidate too, so a screen blurring more than the fixtures does not lose its best match.
+COARSE_CONFIDENCE_RATIO = 0.7
+
+# Every template of a frame, for a few window sizes. Spectra are the size of the transform, about 70 MB at most for a 1600x1250 window.
+TEMPLATE_SPECTRA_CAPACITY = 128
+COARSE_TEMPLATE_CAPACITY = 256
+
+# Spectrum of each template, with the norm of the template without its mean, per size of the transform.
+# Templates of every frame share the same few transform sizes, so spectra are computed once. Shared by every game window.
+_template_spectra: ContentCache[Tuple[np.ndarray, float]] = ContentCache(TEMPLATE_SPECTRA_CAPACITY)
+_coarse_templates: ContentCache[np.ndarray] = ContentCache(COARSE_TEMPLATE_CAPACITY)
+
+
+class Haystack:
+    """
+    Grayscale image prepared once to be matched against many templates, with the same scores as cv2.TM_CCOEFF_NORMED.
+    The cross-correlation of every template is computed in the frequency domain, from the spectrum of the haystack transformed only once.
+    Window statistics, the rest of the normalization, are computed once per template size and shared by templates of the same size.
+    """
+
+    def __init__(self, image: np.ndarray) -> None:
+        self.image = image
+        height, width = image.shape
+        self.dft_shape = (cv2.getOptimalDFTSize(height), cv2.getOptimalDFTSize(width))
+
+        padded_image = np.zeros(self.dft_shape, np.float32)
+        padded_image[:height, :width] = image
+        self.spectrum = cv2.dft(padded_image)
+        self.sums, self.squared_sums = cv2.integral2(image, sdepth=cv2.CV_64F)
+        self._window_norms: Dict[Tuple[int, int], np.ndarray] = {}
+        self._single_window_norms: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def match(self, key: Hashable, template: np.ndarray) -> np.ndarray:
+        """Score of each position of the top left corner of the template, where the template fits in the haystack."""
+        correlation = self._correlate(key, template)
+        if correlation is None:
+            return np.ones(_valid_shape(self.image.shape, template.shape), np.float32)
+
+        numerator, window_norms, template_norm = correlation
+        return _normalize(numerator, window_norms * template_norm).astype(np.float32)
+
+    def locate_all(self, key: Hashable, template: np.ndarray, confidence: float = DEFAULT_CONFIDENCE, limit: int = MATCH_LIMIT) -> List[Point]:
+        """Top left corners scoring over the confidence, in row-major order, like pyscreeze. The confidence is between 0 and 1."""
+        correlation = self._correlate(key, template)
+        if correlation is None:
+            ys, xs = np.nonzero(np.ones(_valid_shape(self.image.shape, template.shape), bool))
+        else:
+            # Candidates are found in single precision, then only their scores are computed
+            numerator, window_norms, template_norm = correlation
+            ys, xs = np.nonzero(numerator > self._load_single_window_norms(template.shape) * np.float32(template_norm * (confidence - CANDIDATE_MARGIN)))
+            matching = _normalize(numerator[ys, xs].astype(np.float64), window_norms[ys, xs] * template_norm) > confidence
+            ys, xs = ys[matching], xs[matching]
+        return [Point(int(x), int(y)) for x, y in zip(xs[:limit], ys[:limit])]
+
+    def locate(self, key: Hashable, template: np.ndarray, confidence: float = DEFAULT_CONFIDENCE) -> Point | None:
+        matches = self.locate_all(key, template, confidence, limit=1)
+        return matches[0] if matches else None
+
+    def _correlate(self, key: Hashable, template: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float] | None:
+        """
+        Cross-correlation of the haystack with the template without its mean, with the norms of the haystack windows and of the template.
+        None when the template is flat, which matches everywhere like in OpenCV.
+        """
+        valid_height, valid_width = _valid_shape(self.image.shape, template.shape)
+        if valid_height == 0 or valid_width == 0:
+            return np.zeros((valid_height, valid_width), np.float32), np.zeros((valid_height, valid_width)), 1.0
+
+        template_spectrum, template_norm = self._load_template_spectrum(key, template)
+        if template_norm < np.finfo(np.float64).eps:
+            return None
+
+        correlation = cv2.idft(cv2.mulSpectrums(self.spectrum, template_spectrum, 0, conjB=True), flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT)
+        return correlation[:valid_height, :valid_width], self._load_window_norms(template.shape), template_norm
+
+    def _load_template_spectrum(self, key: Hashable, template: np.ndarray) -> Tuple[np.ndarray, float]:
+        spectrum_key = (key, self.dft_shape)
+        template_spectrum = _template_spectra.get(spectrum_key)
+        if template_spectrum is None:
+            centered_template = template.astype(np.float64) - template.mean()
+            padded_template = np.zeros(self.dft_shape, np.float32)
+            padded_template[: template.shape[0], : template.shape[1]] = centered_template
+            template_spectrum = cv2.dft(padded_template), float(np.sqrt(np.square(centered_template).sum()))
+            _template_spectra.put(spectrum_key, template_spectrum)
+        return template_spectrum
+
+    def _load_window_norms(self, shape: Tuple[int, int]) -> np.ndarray:
+        """Norm of each window of the haystack without its mean."""
+        window_norms = self._window_norms.get(shape)
+        if window_norms is None:
+            height, width = shape
+            window_sums = _window_sums(self.sums, height, width)
+            window_squared_sums = _window_sums(self.squared_sums, height, width)
+            window_norms = self._window_norms[shape] = np.sqrt(np.maximum(window_squared_sums - window_sums**2 / (height * width), 0))
+        return window_norms
+
+    def _load_single_window_norms(self, shape: Tuple[int, int]) -> np.ndarray:
+        single_window_norms = self._single_window_norms.get(shape)
+        if single_window_norms is None:
+            single_window_norms = self._single_window_norms[shape] = self._load_window_norms(shape).astype(np.float32)
+        return single_window_norms
+
+
+class PyramidHaystack:
+    """
+    Finds the same matches as a Haystack, first on a downscaled region with downscaled templates, with a lower confidence.
+    Each candidate is then confirmed at full resolution, only in the small window it stands for.
+    The search costs about the square of the scale less, which pays off on regions where templates are rarely found.
+    Candidates are the coarse positions over the lowered confidence, or the best coarse position when there is none.
+    """
+
+    def __init__(self, image: np.ndarray, scale: int = PYRAMID_SCALE) -> None:
+        self.image = image
+        self.scale = scale
+        self.coarse_haystack = Haystack(_downscale(image, scale))
+
+    def locate_all(self, key: Hashable, template: np.ndarray, confidence: float = DEFAULT_CONFIDENCE, limit: int = MATCH_LIMIT) -> List[Point]:
+        """Top left corners scoring over the confidence, in row-major order. The confidence is between 0 and 1."""
+        valid_height, valid_width = _valid_shape(self.image.shape, template.shape)
+        coarse_template = self._load_coarse_template(key, template)
+        if valid_height == 0 or valid_width == 0 or min(coarse_template.shape) == 0:
+            return []
+
+        matches = set()
+        template_height, template_width = template.shape
+        # A match blurred over neighbouring coarse positions is confirmed from any of them
+        for candidate in self._find_candidates(key, coarse_template, confidence):
+            left = max(0, (candidate.x - 1) * self.scale)
+            top = max(0, (candidate.y - 1) * self.scale)
+            right = min(valid_width, (candidate.x + 2) * self.scale)
+            bottom = min(valid_height, (candidate.y + 2) * self.scale)
+            if left >= right or top >= bottom:
+                continue
+
+            window = self.image[top : bottom + template_height - 1, left : right + template_width - 1]
+            ys, xs = np.nonzero(cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED) > confidence)
+            matches.update(Point(int(x) + left, int(y) + top) for x, y in zip(xs, ys))
+
+        return sorted(matches, key=lambda point: (point.y, point.x))[:limit]
+
+    def locate(self, key: Hashable, template: np.ndarray, confidence: float = DEFAULT_CONFIDENCE) -> Point | None:
+        matches = self.locate_all(key, template, confidence, limit=1)
+        return matches[0] if matches else None
+
+    def _find_candidates(self, key: Hashable, coarse_template: np.ndarray, confidence: float) -> List[Point]:
+        scores = self.coarse_haystack.match((key, self.scale), coarse_template)
+        if scores.size == 0:
+            return []
+
+        ys, xs = np.nonzero(scores > confidence * COARSE_CONFIDENCE_RATIO)
+        if len(ys) == 0:
+            ys, xs = np.unravel_index([np.argmax(scores)], scores.shape)
+        return [Point(int(x), int(y)) for x, y in zip(xs, ys)]
+
+    def _load_coarse_template(self, key: Hashable, template: np.ndarray) -> np.ndarray:
+        coarse_key = (key, self.scale)
+        coarse_template = _coarse_templates.get(coarse_key)
+        if coarse_template is None:
+            coarse_template = _downscale(template, self.scale)
+            _coarse_templates.put(coarse_key, coarse_template)
+        return coarse_template
+
+
+def _downscale(image: np.ndarray, scale: int) -> np.ndarray:
+    height, width = image.shape
+    if height < scale or width < scale:
+        return np.zeros((0, 0), np.uint8)
+    return cv2.resize(image, (width // scale, height // scale), interpolation=cv2.INTER_AREA)
+
+
+def _valid_shape(image_shape: Tuple[int, int], template_shape: Tuple[int, int]) -> Tuple[int, int]:
+    """Positions where the template fits in the image. Empty when the template is larger than the image."""
+    return max(0, image_shape[0] - template_shape[0] + 1), max(0, image_shape[1] - template_shape[1] + 1)
+
+
+def _normalize(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Same handling of rounding errors and flat windows as OpenCV."""
+    scores = np.zeros(numerator.shape, np.float64)
+    within = np.abs(numerator) < denominator
+    np.divide(numerator, denominator, out=scores, where=within)
+    rounded = ~within & (np.abs(numerator) < denominator * 1.125)
+    scores[rounded] = np.sign(numerator[rounded])
+    return scores
+
+
+def _window_sums(integral: np.ndarray, height: int, width: int) -> np.ndarray:
+    return integral[height:, width:] - integral[:-height, width:] - integral[height:, :-width] + integral[:-height, :-width]
@@ -3,6 +3,39 @@ SAVED_SCREENSHOT_QUANTITY = 20
 
 MOVEMENT_ENABLED = True
 
+# Sends mouse input through "win32" or "pyautogui". Falls back to pyautogui when win32 is not available.
+INPUT_BACKEND = "win32"
+
+# Tile moves are verified on the shifted line right after the drag, and played again this many times when they missed
+MOVE_VERIFICATION_ENABLED = True
+MOVE_RETRIES = 2
+# Moves seen to have landed only wait this long for the board to settle, instead of the whole move delay
+VERIFIED_MOVE_SETTLE_SECONDS = 0.2
+
 AUTO_RUN_AGAIN_ENABLED = False
 
+# Detection slows down while there is no move to play
+IDLE_INITIAL_DELAY_SECONDS = 0.25
+IDLE_MAXIMUM_DELAY_SECONDS = 4.0
+
 MIN_TILE_THRESHOLD = 53
+MIN_REPAIRABLE_TILE_QUANTITY = 32
+
+SCORING_PROFILES_PATH = "config/scoring-profiles.json"
+QUEST = None
+
+# Each bot process needs its own port. 0 picks any free port.
+STATUS_SERVER_PORT = 10000
+
+# Detected regions kept by hash of their pixels. Cells are saved between sessions when a path is given.
+CELL_CACHE_CAPACITY = 4096
+REGION_CACHE_CAPACITY = 256
+CELL_CACHE_PATH = None
+
+# Plies searched after each candidate move, in worker processes. 0 disables the lookahead.
+LOOKAHEAD_DEPTH = 0
+LOOKAHEAD_DEADLINE_SECONDS = 0.3
+LOOKAHEAD_WORKERS = None
+
+# Play every opened game window, instead of only the first one found
+MULTI_WINDOW_ENABLED = False
@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field, replace
+from functools import singledispatch
+from threading import Lock
+from typing import Tuple, Callable, Mapping
+
+from frozendict import frozendict
+
+from src.domain.game_state import GameState
+from src.domain.objective import Move, ChainedMove
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: int = 0
+    game_state: GameState = field(default_factory=GameState)
+    packed_move: Tuple[Move, float] | None = None
+    # Seconds spent in each stage of the bot loop which produced this snapshot
+    timings: Mapping[str, float] = frozendict()
+
+
+@singledispatch
+def identify_move(move: Move) -> Move:
+    """The move without its expected impact, which is sampled again on an unchanged board."""
+    return replace(move, expected_impact=frozendict())
+
+
+@identify_move.register
+def _(move: ChainedMove) -> Move:
+    return replace(move, moves=tuple(identify_move(chained_move) for chained_move in move.moves), expected_impact=frozendict())
+
+
+class SnapshotChannel:
+    """
+    Hand off immutable snapshots from a single writer to any number of readers, without locks.
+    Publishing only replaces references, which is atomic, so readers always see a complete snapshot and never wait.
+    Listeners can be subscribed from any thread, only subscriptions are locked.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot = Snapshot()
+        self._snapshot_hash = 0
+        self._listeners: Tuple[Callable[[], None], ...] = ()
+        self._listeners_lock = Lock()
+
+    def latest(self) -> Snapshot:
+        return self._snapshot
+
+    def publish(self, game_state: GameState, packed_move: Tuple[Move, float] | None, timings: Mapping[str, float] = frozendict()) -> Snapshot:
+        """
+        Only the writer may publish.
+        The version is only incremented, and listeners notified, when the published GameState or selected move changed.
+        Sampled scores are left out, they change on every frame of the same board.
+        """
+        move = identify_move(packed_move[0]) if packed_move is not None else None
+        snapshot_hash = hash((tuple(game_state.grid.tiles), game_state.objective, game_state.items, move))
+        if snapshot_hash == self._snapshot_hash:
+            self._snapshot = Snapshot(self._snapshot.version, self._snapshot.game_state, self._snapshot.packed_move, frozendict(timings))
+            return self._snapshot
+
+        self._snapshot_hash = snapshot_hash
+        self._snapshot = Snapshot(self._snapshot.version + 1, game_state, packed_move, frozendict(timings))
+        for listener in self._listeners:
+            listener()
+
+        return self._snapshot
+
+    def subscribe(self, listener: Callable[[], None]) -> None:
+        # Listeners are copied on write, so the writer can keep iterating the previous tuple.
+        with self._listeners_lock:
+            self._listeners = self._listeners + (listener,)
+
+    def unsubscribe(self, listener: Callable[[], None]) -> None:
+        with self._listeners_lock:
+            self._listeners = tuple(subscribed for subscribed in self._listeners if subscribed != listener)
@@ -0,0 +1,54 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from time import perf_counter
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Imported first by main, so timings are relative to the launch
+LAUNCH_TIME = perf_counter()
+
+# Seconds since launch at which each startup stage completed, in completion order
+stage_times: Dict[str, float] = {}
+
+_detection_preparation: Future | None = None
+
+
+def mark(stage: str) -> None:
+    if stage not in stage_times:
+        stage_times[stage] = perf_counter() - LAUNCH_TIME
+
+
+def report() -> None:
+    logger.info("Startup timings: " + ", ".join(f"{stage} at {seconds:.3f}s" for stage, seconds in stage_times.items()) + ".")
+
+
+def prepare_detection() -> Future:
+    """
+    Import the detection dependencies, preload templates and find the game window, in the background.
+    Started as early as possible so it overlaps with the UI construction. Calling it again returns the same preparation.
+    """
+    global _detection_preparation
+
+    if _detection_preparation is None:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="startup")
+        _detection_preparation = executor.submit(_prepare_detection)
+        executor.shutdown(wait=False)
+
+    return _detection_preparation
+
+
+def _prepare_detection():
+    from src.infra import pyautogui_impl
+
+    mark("detection imports")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        window_discovery = executor.submit(pyautogui_impl.discover_window)
+        executor.submit(pyautogui_impl.preload_templates).result()
+        pyautogui_impl.load_cell_cache()
+        mark("templates")
+        window_discovery.result()
+        mark("window discovery")
+
+    return pyautogui_impl
@@ -1,52 +1,65 @@
 import logging
-from time import sleep
 from typing import Callable
 
-from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QGuiApplication
 
-from src.bot import fetch_game_state
-from src.ui.model import GameStateModel, to_model
+from src import bot
+from src.ui.model import GameStateModel, to_game_state_model
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_REFRESH_RATE = 60
+
+
+class GameStateObserver(QObject):
+    """
+    Notified by the bot every time it publishes a different GameState.
+    Notifications are coalesced so the overlay is updated at most once per display refresh.
+    """
 
-# FIXME probably don't need another thread for this. Observer could be in the bot.
-class GameStateObserverHandler(QObject):
     game_state_changed = pyqtSignal(GameStateModel)
+    _game_state_published = pyqtSignal()
 
-    def __init__(self) -> None:
+    def __init__(self, game_state_changed_callback: Callable[[GameStateModel], None]) -> None:
         super().__init__()
 
-    @pyqtSlot()
-    def run(self) -> None:
-        try:
-            logger.info("Starting GameStateObserverHandler now running.")
-            while True:
-                # TODO save gameState, only trigger update when it changed (only saving hash could be easier)
-                logger.debug("Fetching GameState.")
-                self.game_state_changed.emit(to_model(fetch_game_state()))
-
-                sleep(0.1)
-        except Exception as e:
-            logger.exception(e)
-        finally:
-            logger.info("GameStateObserverHandler is stopped.")
-
-
-class GameStateObserver:
-    def __init__(self, game_state_changed_callback: Callable[[GameStateModel], None]) -> None:
-        self.handler = GameStateObserverHandler()
+        self.version = -1
+        self.listener = self._game_state_published.emit
 
-        self.thread = QThread()
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.timeout.connect(self.update)
 
-        self.handler.game_state_changed.connect(game_state_changed_callback)
-        self.handler.moveToThread(self.thread)
-        self.thread.started.connect(self.handler.run)
+        self.game_state_changed.connect(game_state_changed_callback)
+        # Emitted from the bot thread, so the slot is queued in the UI thread.
+        self._game_state_published.connect(self.schedule_update)
 
     def start(self) -> None:
         logger.info("Starting GameStateObserver.")
-        self.thread.start()
+        screen = QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None and screen.refreshRate() > 0 else DEFAULT_REFRESH_RATE
+        self.update_timer.setInterval(max(1, int(1000 / refresh_rate)))
+
+        bot.channel.subscribe(self.listener)
+        self.schedule_update()
 
     def stop(self) -> None:
         logger.info("Stopping GameStateObserver.")
-        self.thread.stop()
+        bot.channel.unsubscribe(self.listener)
+        self.update_timer.stop()
+
+    @pyqtSlot()
+    def schedule_update(self) -> None:
+        if not self.update_timer.isActive():
+            self.update_timer.start()
+
+    @pyqtSlot()
+    def update(self) -> None:
+        snapshot = bot.channel.latest()
+        if snapshot.version == self.version:
+            return
+
+        logger.debug(f"GameState changed to version {snapshot.version}.")
+        self.version = snapshot.version
+        self.game_state_changed.emit(to_game_state_model(snapshot.game_state, snapshot.packed_move))
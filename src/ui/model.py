@@ -1,10 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from functools import singledispatch
-from typing import List
+from typing import List, Tuple
 
 from src.domain.game_state import GameState
 from src.domain.grid import Grid
-from src.domain.objective import ObjectiveType, Objective
+from src.domain.objective import ObjectiveType, Objective, TileMove, ItemMove, ChainedMove, Move
 from src.domain.tile import TileType, Tile
 
 
@@ -20,10 +20,29 @@ class ObjectiveModel:
     type: ObjectiveType
 
 
+@dataclass(frozen=True)
+class MoveModel:
+    description: str
+    start_grid_x: int | None = None
+    start_grid_y: int | None = None
+    destination_grid_x: int | None = None
+    destination_grid_y: int | None = None
+
+
 @dataclass(frozen=True)
 class GameStateModel:
     tiles: List[TileModel]
     objective: ObjectiveModel
+    move: MoveModel | None = None
+    score: float | None = None
+
+
+def to_game_state_model(game_state: GameState, packed_move: Tuple[Move, float] | None) -> GameStateModel:
+    if packed_move is None:
+        return to_model(game_state)
+
+    move, score = packed_move
+    return GameStateModel(to_model(game_state.grid), to_model(game_state.objective), to_model(move), score)
 
 
 @singledispatch
@@ -58,3 +77,28 @@ def _(tile: Tile) -> TileModel:
 @to_model.register
 def _(objective: Objective) -> ObjectiveModel:
     return ObjectiveModel(objective.type)
+
+
+@to_model.register
+def _(move: TileMove) -> MoveModel:
+    return MoveModel(
+        f"move {str(move.tile_to_move)} -> {str(move.grid_destination)}",
+        move.tile_to_move.grid_position.x,
+        move.tile_to_move.grid_position.y,
+        move.grid_destination.x,
+        move.grid_destination.y,
+    )
+
+
+@to_model.register
+def _(move: ItemMove) -> MoveModel:
+    return MoveModel(str(move))
+
+
+@to_model.register
+def _(move: ChainedMove) -> MoveModel:
+    tile_moves = [chained_move for chained_move in move.moves if isinstance(chained_move, TileMove)]
+    if not tile_moves:
+        return MoveModel(str(move))
+
+    return replace(to_model(tile_moves[-1]), description=str(move))
@@ -1,11 +1,13 @@
 import logging
-from typing import Union
+from typing import Union, Dict, Tuple, List
 
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont
+from PyQt6.QtCore import Qt, QRect, QPoint
+from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPixmap
 from PyQt6.QtWidgets import QWidget, QLabel, QGraphicsDropShadowEffect, QCheckBox
 
-from src import properties
+from src import properties, bot
+from src.command import SetProperty
+from src.domain.screen import BOARD_SIZE_X, BOARD_SIZE_Y
 from src.domain.tile import TileType
 from src.ui.model import GameStateModel
 
@@ -40,6 +42,8 @@ TILE_FILL_COLORS = {
 
 TILE_DIMENSION = 50
 
+MOVE_COLOR = QColor(255, 255, 0, 255)
+
 
 class Overlay(QWidget):
     def __init__(self):
@@ -75,37 +79,103 @@ class Overlay(QWidget):
         effect.setBlurRadius(20)
         self.objective_label.setGraphicsEffect(effect)
 
+        self.move_label = QLabel(self)
+        self.move_label.setText("No move yet")
+        self.move_label.setGeometry(20, 160, 500, 30)
+        self.move_label.setFont(font)
+
         self.game_state: Union[GameStateModel, None] = None
 
+        self.tile_pens = {tile_type: QPen(color, 1) for tile_type, color in TILE_BORDER_COLORS.items()}
+        self.tile_brushes = {tile_type: QBrush(color, Qt.BrushStyle.SolidPattern) for tile_type, color in TILE_FILL_COLORS.items()}
+        self.move_pen = QPen(MOVE_COLOR, 3)
+
+        self.grid_pixmap = QPixmap(BOARD_SIZE_X * TILE_DIMENSION, BOARD_SIZE_Y * TILE_DIMENSION)
+        self.grid_pixmap.fill(Qt.GlobalColor.transparent)
+        self.tile_types: Dict[Tuple[int, int], TileType] = {}
+
         self.start = 0
 
     def toggle_screenshot_logging(self):
-        properties.SCREENSHOT_LOGGING_ENABLED = self.screenshot_logging_cb.isChecked()
+        bot.send_command(SetProperty("SCREENSHOT_LOGGING_ENABLED", self.screenshot_logging_cb.isChecked()))
 
     def toggle_movement(self):
-        properties.MOVEMENT_ENABLED = self.movement_cb.isChecked()
+        bot.send_command(SetProperty("MOVEMENT_ENABLED", self.movement_cb.isChecked()))
 
     def toggle_auto_run_again(self):
-        properties.AUTO_RUN_AGAIN_ENABLED = self.auto_run_again_cb.isChecked()
+        bot.send_command(SetProperty("AUTO_RUN_AGAIN_ENABLED", self.auto_run_again_cb.isChecked()))
 
     def on_game_state_change(self, game_state: GameStateModel):
+        previous_game_state = self.game_state
         self.game_state = game_state
         self.objective_label.setText(repr(game_state.objective))
-        self.update()
+        self.move_label.setText(f"{game_state.move.description} with score {game_state.score:.2f}" if game_state.move is not None else "No move")
+
+        for dirty_rect in self.render_tiles(game_state):
+            self.update(dirty_rect)
+
+        if previous_game_state is None or previous_game_state.move != game_state.move:
+            if previous_game_state is not None:
+                self.update(self.find_move_rect(previous_game_state))
+            self.update(self.find_move_rect(game_state))
+
+    def render_tiles(self, game_state: GameStateModel) -> List[QRect]:
+        """Only tiles which type changed since the last GameState are drawn again in the cached grid."""
+        tile_types = {(tile.grid_x, tile.grid_y): tile.type for tile in game_state.tiles}
+        dirty_positions = {position for position in tile_types.keys() | self.tile_types.keys() if tile_types.get(position) != self.tile_types.get(position)}
+        self.tile_types = tile_types
+
+        if not dirty_positions:
+            return []
+
+        painter = QPainter(self.grid_pixmap)
+        dirty_rects = []
+        for grid_x, grid_y in dirty_positions:
+            rect = QRect(grid_x * TILE_DIMENSION, grid_y * TILE_DIMENSION, TILE_DIMENSION, TILE_DIMENSION)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+            painter.fillRect(rect, Qt.GlobalColor.transparent)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+
+            tile_type = tile_types.get((grid_x, grid_y))
+            if tile_type is not None and tile_type != TileType.UNKNOWN:
+                painter.setPen(self.tile_pens[tile_type])
+                painter.setBrush(self.tile_brushes[tile_type])
+                painter.drawRect(rect.adjusted(0, 0, -1, -1))
+
+            dirty_rects.append(rect.translated(GRID_LEFT, GRID_TOP))
+        painter.end()
+
+        return dirty_rects
+
+    @staticmethod
+    def find_move_rect(game_state: GameStateModel) -> QRect:
+        move = game_state.move
+        if move is None or move.start_grid_x is None:
+            return QRect()
+
+        return QRect(
+            GRID_LEFT + min(move.start_grid_x, move.destination_grid_x) * TILE_DIMENSION,
+            GRID_TOP + min(move.start_grid_y, move.destination_grid_y) * TILE_DIMENSION,
+            (abs(move.start_grid_x - move.destination_grid_x) + 1) * TILE_DIMENSION,
+            (abs(move.start_grid_y - move.destination_grid_y) + 1) * TILE_DIMENSION,
+        )
 
     # Called by self.update()
     def paintEvent(self, event):
-        if self.game_state is None or not self.game_state.tiles:
-            logger.debug("Received no tiles to display :(")
-            return
-
         painter = QPainter(self)
-        for tile in self.game_state.tiles:
-            if tile.type == TileType.UNKNOWN:
-                continue
-
-            rect = [GRID_LEFT + tile.grid_x * TILE_DIMENSION, GRID_TOP + tile.grid_y * TILE_DIMENSION, TILE_DIMENSION, TILE_DIMENSION]
-            painter.setPen(QPen(TILE_BORDER_COLORS[tile.type], 1))
-            painter.setBrush(QBrush(TILE_FILL_COLORS[tile.type], Qt.BrushStyle.SolidPattern))
-            painter.drawRect(*rect)
+        painter.drawPixmap(event.rect(), self.grid_pixmap, event.rect().translated(-GRID_LEFT, -GRID_TOP))
+
+        move = self.game_state.move if self.game_state is not None else None
+        if move is not None and move.start_grid_x is not None:
+            painter.setPen(self.move_pen)
+            painter.drawLine(
+                QPoint(
+                    GRID_LEFT + move.start_grid_x * TILE_DIMENSION + TILE_DIMENSION // 2,
+                    GRID_TOP + move.start_grid_y * TILE_DIMENSION + TILE_DIMENSION // 2,
+                ),
+                QPoint(
+                    GRID_LEFT + move.destination_grid_x * TILE_DIMENSION + TILE_DIMENSION // 2,
+                    GRID_TOP + move.destination_grid_y * TILE_DIMENSION + TILE_DIMENSION // 2,
+                ),
+            )
         painter.end()
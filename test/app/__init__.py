@@ -0,0 +1,3 @@
+import unittest
+
+unittest.TestLoader.testMethodPrefix = "when"
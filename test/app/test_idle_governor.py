@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from src.idle_governor import IdleGovernor
+
+probes = ((10, 20, 30), (40, 50, 60))
+changed_probes = ((10, 20, 30), (0, 0, 0))
+
+
+class TestIdleGovernor(TestCase):
+    def setUp(self) -> None:
+        self.governor = IdleGovernor(initial_delay=0.25, maximum_delay=1.0)
+
+    def when_not_idle_then_detection_is_done(self):
+        self.assertFalse(self.governor.idle)
+        self.assertTrue(self.governor.should_detect(probes))
+
+    def when_idle_without_change_then_delay_doubles_up_to_maximum(self):
+        delays = [self.governor.wait(probes) for _ in range(4)]
+
+        self.assertEqual([0.25, 0.5, 1.0, 1.0], delays)
+
+    def when_idle_without_change_then_detection_is_skipped(self):
+        self.governor.wait(probes)
+
+        self.assertFalse(self.governor.should_detect(probes))
+
+    def when_probes_change_then_detection_resumes_at_full_rate(self):
+        self.governor.wait(probes)
+        self.governor.wait(probes)
+
+        self.assertTrue(self.governor.should_detect(changed_probes))
+        self.assertFalse(self.governor.idle)
+        self.assertEqual(0.25, self.governor.wait(changed_probes))
+
+    def when_maximum_delay_is_reached_then_detection_is_done_anyway(self):
+        for _ in range(3):
+            self.governor.wait(probes)
+
+        self.assertTrue(self.governor.should_detect(probes))
+
+    def when_probes_can_not_be_sampled_then_detection_is_done(self):
+        self.governor.wait(None)
+
+        self.assertTrue(self.governor.should_detect(None))
+
+    def when_woken_then_not_idle(self):
+        self.governor.wait(probes)
+
+        self.governor.wake()
+
+        self.assertFalse(self.governor.idle)
@@ -0,0 +1,69 @@
+from threading import Thread
+from unittest import TestCase
+
+from frozendict import frozendict
+
+from src.domain.game_state import GameState
+from src.domain.impact import Impact
+from src.domain.objective import TileMove
+from src.domain.screen import Point
+from src.domain.tile import TileType, Cluster
+from src.snapshot import SnapshotChannel
+from test.utils import _a_grid
+
+game_state = GameState(_a_grid([TileType.KEY, TileType.LOGS, TileType.SHIELD, TileType.SWORD], Point(2, 2)))
+move_fields = (Cluster(TileType.KEY, frozenset()), game_state.grid.get(0, 0), Point(1, 1))
+move = TileMove(Impact.of({TileType.KEY: 3}), *move_fields)
+
+
+class TestSnapshotChannel(TestCase):
+    def setUp(self) -> None:
+        self.channel = SnapshotChannel()
+        self.notifications = []
+        self.channel.subscribe(lambda: self.notifications.append(self.channel.latest().version))
+
+    def when_publish_new_game_state_then_listeners_are_notified_of_new_version(self):
+        self.channel.publish(game_state, None)
+
+        self.assertEqual([1], self.notifications)
+        self.assertIs(game_state, self.channel.latest().game_state)
+
+    def when_publish_same_game_state_then_listeners_are_not_notified(self):
+        self.channel.publish(game_state, None)
+        self.channel.publish(GameState(game_state.grid), None)
+
+        self.assertEqual([1], self.notifications)
+
+    def when_publish_same_move_with_other_sampled_score_then_listeners_are_not_notified(self):
+        self.channel.publish(game_state, (TileMove(move.impact, *move_fields, expected_impact=frozendict({TileType.KEY: 0.4})), 3.4))
+        self.channel.publish(game_state, (TileMove(move.impact, *move_fields, expected_impact=frozendict({TileType.KEY: 0.6})), 3.6))
+
+        self.assertEqual([1], self.notifications)
+
+    def when_unsubscribed_then_listener_is_not_notified(self):
+        channel = SnapshotChannel()
+        listener = lambda: self.fail("Listener should not be notified.")
+        channel.subscribe(listener)
+        channel.unsubscribe(listener)
+
+        channel.publish(game_state, None)
+
+    def when_listeners_subscribe_from_several_threads_then_none_is_lost(self):
+        channel = SnapshotChannel()
+        notifications = []
+        threads = [Thread(target=lambda: [channel.subscribe(lambda: notifications.append(1)) for _ in range(100)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        channel.publish(game_state, None)
+
+        self.assertEqual(400, len(notifications))
+
+    def when_publish_same_game_state_with_new_timings_then_timings_are_updated_without_new_version(self):
+        self.channel.publish(game_state, None, {"detection": 1.0})
+        self.channel.publish(game_state, None, {"detection": 0.5})
+
+        self.assertEqual(1, self.channel.latest().version)
+        self.assertEqual({"detection": 0.5}, self.channel.latest().timings)
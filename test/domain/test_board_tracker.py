@@ -0,0 +1,84 @@
+from unittest import TestCase
+
+from src.domain.board_tracker import BoardTracker, MAX_CARRIED_FRAMES
+from src.domain.impact import NO_IMPACT
+from src.domain.item import Item, ItemType
+from src.domain.objective import TileMove, ItemMove, ChainedMove
+from src.domain.screen import Point, ScreenSquare
+from src.domain.tile import TileType, Cluster
+from test.utils import _a_grid
+
+SIZE = Point(3, 3)
+
+INITIAL_TYPES = [TileType.KEY, TileType.LOGS, TileType.SHIELD, TileType.SWORD, TileType.WAND, TileType.CHEST, TileType.ROCKS, TileType.LOGS, TileType.SHIELD]
+
+
+def _with(types, index, tile_type):
+    types = types.copy()
+    types[index] = tile_type
+    return types
+
+
+class TestGivenConfirmedBoard(TestCase):
+    def setUp(self) -> None:
+        self.tracker = BoardTracker()
+        self.tracker.track_grid(_a_grid(INITIAL_TYPES, SIZE))
+
+    def when_tile_changes_once_then_change_is_not_trusted(self):
+        grid = self.tracker.track_grid(_a_grid(_with(INITIAL_TYPES, 4, TileType.KEY), SIZE))
+
+        self.assertEqual(INITIAL_TYPES, [tile.type for tile in grid])
+
+    def when_tile_changes_twice_the_same_way_then_change_is_trusted(self):
+        self.tracker.track_grid(_a_grid(_with(INITIAL_TYPES, 4, TileType.KEY), SIZE))
+        grid = self.tracker.track_grid(_a_grid(_with(INITIAL_TYPES, 4, TileType.KEY), SIZE))
+
+        self.assertEqual(_with(INITIAL_TYPES, 4, TileType.KEY), [tile.type for tile in grid])
+
+    def when_tile_is_not_detected_then_confirmed_tile_is_kept(self):
+        grid = self.tracker.track_grid(_a_grid(_with(INITIAL_TYPES, 4, TileType.UNKNOWN), SIZE))
+
+        self.assertEqual(INITIAL_TYPES, [tile.type for tile in grid])
+
+    def when_tile_is_not_detected_for_too_long_then_it_is_dropped(self):
+        for _ in range(MAX_CARRIED_FRAMES + 1):
+            grid = self.tracker.track_grid(_a_grid(_with(INITIAL_TYPES, 4, TileType.UNKNOWN), SIZE))
+
+        self.assertEqual(8, len(grid))
+        self.assertIsNone(grid.get(1, 1))
+
+    def when_most_tiles_are_not_detected_then_only_detected_tiles_are_kept(self):
+        types = [TileType.KEY, TileType.LOGS, TileType.SHIELD, TileType.SWORD] + [TileType.UNKNOWN] * 5
+
+        grid = self.tracker.track_grid(_a_grid(types, SIZE))
+
+        self.assertEqual(types[:4], [tile.type for tile in grid])
+
+    def when_most_tiles_change_then_detection_is_trusted(self):
+        new_types = [TileType.WAND, TileType.SWORD, TileType.KEY, TileType.LOGS, TileType.ROCKS, TileType.SWORD, TileType.CHEST, TileType.KEY, TileType.WAND]
+
+        grid = self.tracker.track_grid(_a_grid(new_types, SIZE))
+
+        self.assertEqual(new_types, [tile.type for tile in grid])
+
+
+class TestGivenExpectedMove(TestCase):
+    def when_detection_agrees_with_prediction_then_shifted_tiles_are_trusted(self):
+        tracker = BoardTracker()
+        grid = tracker.track_grid(_a_grid(INITIAL_TYPES, SIZE))
+        shifted_grid = grid.shift(Point(0, 0), Point(1, 0))
+        tracker.expect(grid, TileMove(NO_IMPACT, Cluster(TileType.KEY, frozenset()), grid.get(0, 0), Point(1, 0)))
+
+        tracked_grid = tracker.track_grid(shifted_grid)
+
+        self.assertEqual([tile.type for tile in shifted_grid], [tile.type for tile in tracked_grid])
+
+    def when_scroll_then_tile_move_are_chained_then_both_are_predicted(self):
+        tracker = BoardTracker()
+        grid = tracker.track_grid(_a_grid(INITIAL_TYPES, SIZE))
+        scroll = Item(ItemType.LOG_TO_KEY_SCROLL, ScreenSquare(0, 0, 10, 10))
+        tile_move = TileMove(NO_IMPACT, Cluster(TileType.KEY, frozenset()), grid.get(0, 0), Point(1, 0))
+
+        tracker.expect(grid, ChainedMove(NO_IMPACT, (ItemMove(NO_IMPACT, scroll), tile_move)))
+
+        self.assertEqual(grid.transform(TileType.LOGS, TileType.KEY).shift(Point(0, 0), Point(1, 0)), tracker.predicted_grid)
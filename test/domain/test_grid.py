@@ -1,7 +1,7 @@
 from typing import List
 from unittest import TestCase
 
-from src.domain.grid import Grid
+from src.domain.grid import Grid, InconsistentGrid
 from src.domain.screen import Point
 from src.domain.tile import TileType, Tile
 from test.utils import _a_grid
@@ -153,3 +153,26 @@ class TestGridDoubleComboWithGravity(TestCase):
             {TileType.KEY: 3, TileType.SWORD: 3},
             impact,
         )
+
+
+class TestInconsistentGrid(TestCase):
+    grid = InconsistentGrid([Tile(TileType.KEY, Point(0, 0)), Tile(TileType.SWORD, Point(2, 0)), Tile(TileType.WAND, Point(1, 1))], Point(3, 2))
+
+    def when_find_missing_positions_then_only_positions_without_tile_are_found(self):
+        missing_positions = self.grid.find_missing_positions()
+
+        self.assertEqual([Point(1, 0), Point(0, 1), Point(2, 1)], missing_positions)
+
+    def when_fill_with_unknown_then_missing_positions_are_unknown(self):
+        grid = self.grid.fill_with_unknown()
+
+        self.assertEqual(
+            [TileType.KEY, TileType.UNKNOWN, TileType.SWORD, TileType.UNKNOWN, TileType.WAND, TileType.UNKNOWN],
+            [tile.type for tile in grid],
+        )
+        self.assertEqual([Point(x, y) for y in range(2) for x in range(3)], [tile.grid_position for tile in grid])
+
+    def when_fill_with_unknown_then_board_tiles_are_interned(self):
+        grid = self.grid.fill_with_unknown()
+
+        self.assertIs(grid.get(1, 0), grid.shift(Point(1, 0), Point(1, 1)).shift(Point(1, 1), Point(1, 0)).get(1, 0))
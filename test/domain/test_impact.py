@@ -0,0 +1,25 @@
+from unittest import TestCase
+
+from src.domain.impact import Impact
+from src.domain.tile import TileType
+
+
+class TestImpact(TestCase):
+    def when_count_tile_types_then_impact_reads_like_sparse_mapping(self):
+        impact = Impact.count([TileType.KEY, TileType.SWORD, TileType.KEY])
+
+        self.assertEqual({TileType.KEY: 2, TileType.SWORD: 1}, dict(impact))
+        self.assertNotIn(TileType.WAND, impact)
+
+    def when_impacts_have_same_quantities_then_they_are_equal_and_have_same_hash(self):
+        impact = Impact.count([TileType.KEY, TileType.SWORD])
+        same_impact = Impact.of({TileType.SWORD: 1, TileType.KEY: 1})
+
+        self.assertEqual(impact, same_impact)
+        self.assertEqual(hash(impact), hash(same_impact))
+
+    def when_as_array_then_quantities_are_indexed_by_tile_type_ordinal(self):
+        array = Impact.of({TileType.CHEST: 3}).as_array()
+
+        self.assertEqual([3, 0, 0, 0, 0, 0, 0, 0, 0], array.tolist())
+        self.assertFalse(array.flags.writeable)
@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+from src.domain.item import Item, ItemType
+from src.domain.item_planner import plan_item_moves, simulate_item_use
+from src.domain.objective import ItemMove, ChainedMove, TileMove, Objective, ObjectiveType
+from src.domain.refill import RefillModel
+from src.domain.scoring_profile import DEFAULT_SCORING_PROFILES
+from src.domain.screen import Point, ScreenSquare
+from src.domain.tile import TileType
+from test.utils import _a_grid
+
+LOG_TO_KEY_SCROLL = Item(ItemType.LOG_TO_KEY_SCROLL, ScreenSquare(0, 0, 10, 10))
+BREAD = Item(ItemType.BREAD, ScreenSquare(0, 20, 10, 10))
+
+# Logs next to the pair of keys in the first row, and a pair of rocks in the second row completed by the rock at (2, 3)
+GRID = _a_grid(
+    [
+        *[TileType.KEY, TileType.KEY, TileType.LOGS, TileType.SWORD],
+        *[TileType.ROCKS, TileType.ROCKS, TileType.WAND, TileType.CHEST],
+        *[TileType.SWORD, TileType.SHIELD, TileType.CHEST, TileType.SHIELD],
+        *[TileType.WAND, TileType.CHEST, TileType.ROCKS, TileType.SWORD],
+    ],
+    Point(4, 4),
+)
+
+# The only logs combine with nothing once turned into keys, while the sword at (2, 1) completes the pair of swords of the first row
+GRID_WITH_USELESS_LOGS = _a_grid(
+    [
+        *[TileType.SWORD, TileType.SWORD, TileType.WAND, TileType.CHEST],
+        *[TileType.SHIELD, TileType.ROCKS, TileType.SWORD, TileType.WAND],
+        *[TileType.CHEST, TileType.WAND, TileType.ROCKS, TileType.SHIELD],
+        *[TileType.ROCKS, TileType.SHIELD, TileType.CHEST, TileType.LOGS],
+    ],
+    Point(4, 4),
+)
+
+
+class TestItemPlanner(TestCase):
+    def when_scroll_is_used_then_transformed_tiles_combine(self):
+        impact, _ = simulate_item_use(GRID, LOG_TO_KEY_SCROLL)
+
+        self.assertEqual({TileType.KEY: 3}, impact)
+
+    def when_plan_item_moves_then_scroll_impact_is_simulated(self):
+        moves = plan_item_moves(GRID, frozenset({LOG_TO_KEY_SCROLL}))
+
+        self.assertIn(ItemMove(simulate_item_use(GRID, LOG_TO_KEY_SCROLL)[0], LOG_TO_KEY_SCROLL), moves)
+
+    def when_plan_item_moves_then_scroll_is_chained_with_tile_moves_on_transformed_grid(self):
+        moves = plan_item_moves(GRID, frozenset({LOG_TO_KEY_SCROLL}))
+
+        chained_moves = [move for move in moves if isinstance(move, ChainedMove)]
+        self.assertTrue(chained_moves)
+        for chained_move in chained_moves:
+            self.assertIsInstance(chained_move.moves[-1], TileMove)
+            self.assertEqual(
+                sum(move.impact[TileType.KEY] for move in chained_move.moves if TileType.KEY in move.impact), chained_move.impact.get(TileType.KEY, 0)
+            )
+
+    def when_item_does_not_transform_tiles_then_flat_impact_is_kept(self):
+        moves = plan_item_moves(GRID, frozenset({BREAD}))
+
+        self.assertEqual({TileType.SHIELD: 6}, next(iter(moves)).impact)
+
+    def when_scroll_adds_nothing_to_a_tile_move_then_they_are_not_chained(self):
+        moves = plan_item_moves(GRID_WITH_USELESS_LOGS, frozenset({LOG_TO_KEY_SCROLL}))
+
+        self.assertFalse([move for move in moves if isinstance(move, ChainedMove)])
+
+    def when_scroll_adds_nothing_with_refills_sampled_then_they_are_not_chained(self):
+        moves = plan_item_moves(GRID_WITH_USELESS_LOGS, frozenset({LOG_TO_KEY_SCROLL}), RefillModel(sample_quantity=50, seed=0))
+
+        self.assertFalse([move for move in moves if isinstance(move, ChainedMove)])
+
+    def when_refills_are_sampled_then_chains_expect_the_impact_of_their_tile_move(self):
+        moves = plan_item_moves(GRID, frozenset({LOG_TO_KEY_SCROLL}), RefillModel(sample_quantity=50, seed=0))
+
+        chained_moves = [move for move in moves if isinstance(move, ChainedMove)]
+        self.assertTrue(chained_moves)
+        for chained_move in chained_moves:
+            self.assertEqual(chained_move.moves[-1].expected_impact, chained_move.expected_impact)
+
+    def when_scroll_adds_nothing_then_tile_move_is_selected_without_it(self):
+        moves = plan_item_moves(GRID_WITH_USELESS_LOGS, frozenset({LOG_TO_KEY_SCROLL})) | GRID_WITH_USELESS_LOGS.find_possible_moves()
+
+        best_move, _ = Objective(ObjectiveType.ZOMBIE).select_best_move(moves, DEFAULT_SCORING_PROFILES.find_tile_values(ObjectiveType.ZOMBIE))
+
+        self.assertIsInstance(best_move, TileMove)
@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from src.domain.impact import NO_IMPACT
+from src.domain.lookahead import SequentialPlanner, encode_grid, decode_grid
+from src.domain.objective import TileMove
+from src.domain.screen import Point
+from src.domain.scoring import to_tile_vector
+from src.domain.tile import TileType, Cluster
+from test.utils import _a_grid
+
+# Moving the sword at (3, 0) to (2, 0) leaves the pair of keys at (0, 1) and (1, 1), completed by moving the key at (2, 2) up
+GRID = _a_grid(
+    [
+        *[TileType.SWORD, TileType.SWORD, TileType.WAND, TileType.SWORD],
+        *[TileType.KEY, TileType.KEY, TileType.CHEST, TileType.LOGS],
+        *[TileType.ROCKS, TileType.SHIELD, TileType.KEY, TileType.WAND],
+        *[TileType.LOGS, TileType.CHEST, TileType.ROCKS, TileType.SHIELD],
+    ],
+    Point(4, 4),
+)
+
+MOVE = TileMove(NO_IMPACT, Cluster(TileType.SWORD, frozenset()), GRID.get(3, 0), Point(2, 0))
+
+TILE_VALUES = to_tile_vector({TileType.KEY: 1})
+
+TILE_CYCLE = [TileType.SWORD, TileType.KEY, TileType.WAND, TileType.KEY, TileType.SHIELD, TileType.LOGS, TileType.KEY]
+
+
+class TestLookahead(TestCase):
+    def when_encode_grid_then_decoded_grid_is_the_same(self):
+        self.assertEqual(GRID, decode_grid(encode_grid(GRID)))
+
+    def when_follow_up_completes_a_combo_then_it_is_scored(self):
+        follow_up_scores = SequentialPlanner(depth=1, deadline_seconds=10).evaluate_follow_ups(GRID, [MOVE], TILE_VALUES)
+
+        self.assertGreater(follow_up_scores[MOVE], 0)
+
+    def when_planners_search_then_each_uses_its_own_move_index(self):
+        planner, other_planner = SequentialPlanner(depth=1, deadline_seconds=10), SequentialPlanner(depth=1, deadline_seconds=10)
+
+        planner.evaluate_follow_ups(GRID, [MOVE], TILE_VALUES)
+
+        self.assertIsNot(planner.move_index, other_planner.move_index)
+        self.assertIsNotNone(planner.move_index.grid)
+        self.assertIsNone(other_planner.move_index.grid)
+
+    def when_deadline_is_already_passed_then_no_move_is_evaluated(self):
+        follow_up_scores = SequentialPlanner(depth=1, deadline_seconds=-1).evaluate_follow_ups(GRID, [MOVE], TILE_VALUES)
+
+        self.assertEqual({}, follow_up_scores)
+
+    def when_not_every_move_is_evaluated_then_no_follow_up_is_returned(self):
+        # Too many plies on a full board to be searched before the deadline
+        grid = _a_grid([TILE_CYCLE[(x + 2 * y) % len(TILE_CYCLE)] for y in range(7) for x in range(8)], Point(8, 7))
+        moves = [TileMove(NO_IMPACT, Cluster(TileType.KEY, frozenset()), grid.get(0, y), Point(1, y)) for y in range(7)]
+
+        follow_up_scores = SequentialPlanner(depth=8, deadline_seconds=0.05).evaluate_follow_ups(grid, moves, TILE_VALUES)
+
+        self.assertEqual({}, follow_up_scores)
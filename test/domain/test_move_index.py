@@ -0,0 +1,66 @@
+from unittest import TestCase
+
+from src.domain.grid import Grid
+from src.domain.move_index import MoveIndex
+from src.domain.refill import RefillModel
+from src.domain.screen import Point
+from src.domain.tile import TileType, board_tile
+from test.utils import _a_grid
+
+SIZE = Point(4, 4)
+
+# Keys at (0, 0) and (1, 0) are completed by the key at (2, 1), logs at (0, 2) and (0, 3) by the logs at (1, 1)
+TYPES = [
+    *[TileType.KEY, TileType.KEY, TileType.SWORD, TileType.WAND],
+    *[TileType.SHIELD, TileType.LOGS, TileType.KEY, TileType.CHEST],
+    *[TileType.LOGS, TileType.SWORD, TileType.ROCKS, TileType.WAND],
+    *[TileType.LOGS, TileType.CHEST, TileType.SHIELD, TileType.ROCKS],
+]
+
+
+class TestMoveIndex(TestCase):
+    def setUp(self) -> None:
+        self.grid = _a_grid(TYPES, SIZE)
+        self.move_index = MoveIndex()
+
+    def when_find_possible_moves_then_same_moves_as_grid_are_found(self):
+        self.assertEqual(self.grid.find_possible_moves(), self.move_index.find_possible_moves(self.grid))
+
+    def when_grid_changes_then_only_changed_tiles_are_updated(self):
+        self.move_index.find_possible_moves(self.grid)
+        tiles = self.grid.tiles.copy()
+        tiles[15] = board_tile(TileType.SWORD, Point(3, 3))
+        changed_grid = Grid(tiles, SIZE)
+
+        changed_indices = self.move_index.update(changed_grid)
+
+        self.assertEqual([15], changed_indices)
+        self.assertEqual(changed_grid.find_possible_moves(), self.move_index.find_possible_moves(changed_grid))
+
+    def when_grid_does_not_change_then_simulations_are_reused(self):
+        self.move_index.find_possible_moves(self.grid)
+        simulations = dict(self.move_index.simulations)
+
+        self.move_index.find_possible_moves(self.grid)
+
+        self.assertTrue(simulations)
+        for candidate, simulation in simulations.items():
+            self.assertIs(simulation, self.move_index.simulations[candidate])
+
+    def when_grid_does_not_change_then_refills_are_not_sampled_again(self):
+        refill_model = RefillModel(sample_quantity=50, seed=0)
+        moves = self.move_index.find_possible_moves(self.grid, refill_model)
+
+        self.assertTrue(any(move.expected_impact for move in moves))
+        self.assertEqual(moves, self.move_index.find_possible_moves(self.grid, refill_model))
+
+    def when_tile_of_footprint_changes_then_expected_impact_is_invalidated(self):
+        self.move_index.find_possible_moves(self.grid, RefillModel(sample_quantity=50, seed=0))
+        sampled_candidates = set(self.move_index.expected_impacts)
+        tiles = self.grid.tiles.copy()
+        tiles[15] = board_tile(TileType.SWORD, Point(3, 3))
+
+        self.move_index.update(Grid(tiles, SIZE))
+
+        self.assertLess(set(self.move_index.expected_impacts), sampled_candidates)
+        self.assertEqual(set(self.move_index.simulations), set(self.move_index.expected_impacts))
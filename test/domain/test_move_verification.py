@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from src.domain.impact import NO_IMPACT
+from src.domain.item import Item, ItemType
+from src.domain.move_verification import ExpectedLine, MoveOutcome, find_verified_step
+from src.domain.objective import TileMove, ItemMove, ChainedMove
+from src.domain.screen import Point, ScreenSquare
+from src.domain.tile import TileType, Cluster
+from test.utils import _a_grid
+
+SIZE = Point(4, 3)
+
+TYPES = [
+    *[TileType.KEY, TileType.KEY, TileType.WAND, TileType.KEY],
+    *[TileType.LOGS, TileType.SWORD, TileType.ROCKS, TileType.SHIELD],
+    *[TileType.CHEST, TileType.WAND, TileType.LOGS, TileType.SWORD],
+]
+
+grid = _a_grid(TYPES, SIZE)
+move = TileMove(NO_IMPACT, Cluster(TileType.KEY, frozenset()), grid.get(3, 0), Point(0, 0))
+
+
+class TestExpectedLine(TestCase):
+    def setUp(self) -> None:
+        self.line = ExpectedLine.of(grid, move)
+
+    def when_line_is_built_then_it_is_the_shifted_row(self):
+        self.assertEqual((TileType.KEY, TileType.KEY, TileType.WAND, TileType.KEY), self.line.before)
+        self.assertEqual((TileType.KEY, TileType.KEY, TileType.KEY, TileType.WAND), self.line.after)
+        self.assertEqual({Point(0, 0), Point(1, 0), Point(2, 0)}, self.line.combining_positions)
+
+    def when_line_shows_shifted_tiles_then_move_landed(self):
+        self.assertEqual(MoveOutcome.LANDED, self.line.verify([TileType.KEY, TileType.KEY, TileType.KEY, TileType.WAND]))
+
+    def when_line_did_not_change_then_move_missed(self):
+        self.assertEqual(MoveOutcome.MISSED, self.line.verify([TileType.KEY, TileType.KEY, TileType.WAND, TileType.UNKNOWN]))
+
+    def when_combining_tiles_are_gone_then_cascade_started(self):
+        self.assertEqual(MoveOutcome.CASCADE, self.line.verify([TileType.UNKNOWN, TileType.UNKNOWN, TileType.UNKNOWN, TileType.WAND]))
+
+    def when_nothing_is_recognized_then_outcome_is_unknown(self):
+        self.assertEqual(MoveOutcome.UNKNOWN, self.line.verify([TileType.UNKNOWN] * 4))
+
+    def when_line_changed_otherwise_then_move_is_not_missed(self):
+        self.assertNotEqual(MoveOutcome.MISSED, self.line.verify([TileType.WAND, TileType.KEY, TileType.KEY, TileType.KEY]))
+
+
+class TestFindVerifiedStep(TestCase):
+    def when_move_is_a_tile_move_then_it_is_verified_on_the_detected_grid(self):
+        self.assertEqual((move, grid), find_verified_step(move, grid))
+
+    def when_chain_ends_with_a_tile_move_then_it_is_verified_on_the_predicted_grid(self):
+        scroll_move = ItemMove(NO_IMPACT, Item(ItemType.LOG_TO_KEY_SCROLL, ScreenSquare(0, 0, 10, 10)))
+        chained_move = ChainedMove(NO_IMPACT, (scroll_move, move))
+
+        tile_move, step_grid = find_verified_step(chained_move, grid)
+
+        self.assertEqual(move, tile_move)
+        self.assertEqual(TileType.KEY, step_grid.get(0, 1).type)
+
+    def when_move_is_an_item_move_then_nothing_is_verified(self):
+        scroll_move = ItemMove(NO_IMPACT, Item(ItemType.LOG_TO_KEY_SCROLL, ScreenSquare(0, 0, 10, 10)))
+
+        self.assertIsNone(find_verified_step(scroll_move, grid))
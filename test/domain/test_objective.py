@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from frozendict import frozendict
+
+from src.domain.impact import Impact
+from src.domain.item import Item, ItemType
+from src.domain.objective import Objective, ObjectiveType, TileMove, ItemMove, ChainedMove
+from src.domain.scoring_profile import DEFAULT_SCORING_PROFILES
+from src.domain.screen import Point, ScreenSquare
+from src.domain.tile import TileType, Tile, Cluster
+
+
+def _a_tile_move(impact, tile_position: Point, destination: Point, expected_impact=frozendict()) -> TileMove:
+    return TileMove(
+        Impact.of(impact), Cluster(TileType.UNKNOWN, frozenset()), Tile(TileType.UNKNOWN, tile_position), destination, expected_impact=expected_impact
+    )
+
+
+class TestSelectBestMove(TestCase):
+    objective = Objective(ObjectiveType.ZOMBIE)
+    tile_values = DEFAULT_SCORING_PROFILES.find_tile_values(ObjectiveType.ZOMBIE)
+
+    def when_select_best_move_then_move_with_best_score_is_selected(self):
+        sword_move = _a_tile_move({TileType.SWORD: 3}, Point(0, 0), Point(0, 1))
+        logs_move = _a_tile_move({TileType.LOGS: 4}, Point(0, 0), Point(0, 1))
+
+        best_move, score = self.objective.select_best_move({sword_move, logs_move}, self.tile_values)
+
+        self.assertEqual(sword_move, best_move)
+        self.assertEqual(9, score)
+
+    def when_moves_have_same_score_then_move_using_fewer_items_is_selected(self):
+        tile_move = _a_tile_move({TileType.SWORD: 3}, Point(0, 0), Point(0, 1))
+        scroll_move = ItemMove(Impact.of({}), Item(ItemType.LOG_TO_KEY_SCROLL, ScreenSquare(0, 0, 10, 10)))
+        chained_move = ChainedMove(tile_move.impact, (scroll_move, tile_move))
+
+        best_move, _ = self.objective.select_best_move({chained_move, tile_move}, self.tile_values)
+
+        self.assertEqual(tile_move, best_move)
+
+    def when_moves_have_same_score_then_closest_move_is_selected(self):
+        far_move = _a_tile_move({TileType.SWORD: 3}, Point(0, 0), Point(0, 3))
+        close_move = _a_tile_move({TileType.SWORD: 3}, Point(0, 0), Point(0, 1))
+
+        best_move, _ = self.objective.select_best_move({far_move, close_move}, self.tile_values)
+
+        self.assertEqual(close_move, best_move)
+
+    def when_move_has_expected_impact_then_it_counts_in_score(self):
+        move = _a_tile_move({TileType.SWORD: 3}, Point(0, 0), Point(0, 1), frozendict({TileType.WAND: 0.5}))
+
+        _, score = self.objective.select_best_move({move}, self.tile_values)
+
+        self.assertEqual(10.5, score)
+
+    def when_only_negative_moves_then_no_move_is_selected(self):
+        key_move = _a_tile_move({TileType.KEY: 3}, Point(0, 0), Point(0, 1))
+
+        self.assertIsNone(self.objective.select_best_move({key_move}, self.tile_values))
@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+from src.domain.refill import RefillModel, MAX_CASCADE_DEPTH
+from src.domain.screen import Point
+from src.domain.tile import TileType, TILE_TYPE_INDICES
+from test.utils import _a_grid
+
+
+def _a_refill_model_only_refilling(tile_type: TileType) -> RefillModel:
+    refill_model = RefillModel(sample_quantity=10, seed=0)
+    refill_model.tile_counts[:] = 0
+    refill_model.tile_counts[TILE_TYPE_INDICES[tile_type]] = 1
+    return refill_model
+
+
+class TestGivenUnknownTileOnTopOfPair(TestCase):
+    grid = _a_grid(
+        [TileType.UNKNOWN, TileType.SWORD, TileType.WAND, TileType.KEY, TileType.LOGS, TileType.SHIELD, TileType.KEY, TileType.SHIELD, TileType.LOGS],
+        Point(3, 3),
+    )
+
+    def when_refilled_tiles_keep_completing_the_pair_then_cascades_are_expected_until_max_depth(self):
+        refill_model = _a_refill_model_only_refilling(TileType.KEY)
+
+        expected_impacts = refill_model.calculate_expected_impacts([self.grid])
+
+        self.assertEqual([{TileType.KEY: 3 * MAX_CASCADE_DEPTH}], expected_impacts)
+
+    def when_refilled_tile_does_not_complete_the_pair_then_nothing_is_expected(self):
+        refill_model = _a_refill_model_only_refilling(TileType.ROCKS)
+
+        expected_impacts = refill_model.calculate_expected_impacts([self.grid])
+
+        self.assertEqual([{}], expected_impacts)
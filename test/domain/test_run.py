@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from src.domain.run import RunLifecycle, GameScreen, RunPhase
+
+
+class TestRunLifecycle(TestCase):
+    def setUp(self) -> None:
+        self.lifecycle = RunLifecycle()
+
+    def when_game_screen_is_seen_then_run_starts(self):
+        self.lifecycle.observe(GameScreen.GAME, 10)
+
+        self.assertEqual(RunPhase.PLAYING, self.lifecycle.phase)
+        self.assertEqual(1, self.lifecycle.current_run.number)
+        self.assertEqual(10, self.lifecycle.current_run.start_time)
+
+    def when_game_screen_is_seen_again_then_same_run_continues(self):
+        self.lifecycle.observe(GameScreen.GAME, 10)
+        self.lifecycle.observe(GameScreen.UNKNOWN, 20)
+        self.lifecycle.observe(GameScreen.GAME, 30)
+
+        self.assertEqual(1, len(self.lifecycle.runs))
+
+    def when_end_of_run_screen_is_seen_then_run_ends_with_its_statistics(self):
+        self.lifecycle.observe(GameScreen.GAME, 10)
+        self.lifecycle.record_move()
+        self.lifecycle.record_move()
+
+        self.lifecycle.observe(GameScreen.END_OF_RUN, 70)
+
+        self.assertEqual(RunPhase.ENDED, self.lifecycle.phase)
+        self.assertIsNone(self.lifecycle.current_run)
+        self.assertEqual(60, self.lifecycle.runs[0].duration)
+        self.assertEqual(2, self.lifecycle.runs[0].moves)
+
+    def when_menu_screen_is_seen_then_run_ends(self):
+        self.lifecycle.observe(GameScreen.GAME, 10)
+
+        self.lifecycle.observe(GameScreen.MENU, 70)
+
+        self.assertEqual(RunPhase.ENDED, self.lifecycle.phase)
+
+    def when_game_screen_is_seen_after_end_of_run_then_next_run_starts(self):
+        self.lifecycle.observe(GameScreen.GAME, 10)
+        self.lifecycle.observe(GameScreen.END_OF_RUN, 70)
+
+        self.lifecycle.observe(GameScreen.GAME, 80)
+
+        self.assertEqual(2, self.lifecycle.current_run.number)
+
+    def when_unknown_screen_is_seen_then_nothing_changes(self):
+        self.lifecycle.observe(GameScreen.UNKNOWN, 10)
+
+        self.assertEqual(RunPhase.WAITING, self.lifecycle.phase)
+
+    def when_move_is_recorded_without_run_then_it_is_ignored(self):
+        self.lifecycle.record_move()
+
+        self.assertEqual([], self.lifecycle.runs)
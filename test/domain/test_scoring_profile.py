@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+from src.domain.objective import ObjectiveType
+from src.domain.scoring_profile import ScoringProfiles, StatusModifiers
+from src.domain.status import Status
+from src.domain.tile import TileType, TILE_TYPE_INDICES
+
+scoring_profiles = ScoringProfiles(
+    {ObjectiveType.ZOMBIE: {TileType.SWORD: 3, TileType.SHIELD: 2, TileType.KEY: -1}, None: {TileType.SHIELD: 2, TileType.KEY: -0.5}},
+    StatusModifiers([(1, {TileType.KEY: -0.5}), (3, {TileType.KEY: -1})]),
+)
+
+
+def _value_of(tile_values, tile_type: TileType) -> float:
+    return tile_values[TILE_TYPE_INDICES[tile_type]]
+
+
+class TestScoringProfiles(TestCase):
+    def when_find_tile_values_for_objective_then_objective_values_are_found(self):
+        tile_values = scoring_profiles.find_tile_values(ObjectiveType.ZOMBIE)
+
+        self.assertEqual(3, _value_of(tile_values, TileType.SWORD))
+        self.assertEqual(0, _value_of(tile_values, TileType.WAND))
+
+    def when_find_tile_values_for_unknown_objective_then_default_values_are_found(self):
+        tile_values = scoring_profiles.find_tile_values(ObjectiveType.GOLEM)
+
+        self.assertEqual(-0.5, _value_of(tile_values, TileType.KEY))
+
+    def when_many_keys_are_owned_then_deltas_of_highest_reached_quantity_are_applied(self):
+        self.assertEqual(-1.5, _value_of(scoring_profiles.find_tile_values(ObjectiveType.ZOMBIE, Status(key_quantity=2)), TileType.KEY))
+        self.assertEqual(-2, _value_of(scoring_profiles.find_tile_values(ObjectiveType.ZOMBIE, Status(key_quantity=4)), TileType.KEY))
+
+    def when_no_key_is_owned_then_values_are_unchanged(self):
+        self.assertEqual(-1, _value_of(scoring_profiles.find_tile_values(ObjectiveType.ZOMBIE, Status(key_quantity=0)), TileType.KEY))
@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from PIL import Image
+
+from src.domain.screen import Point, ScreenSquare
+from src.infra.calibration import TILE_DIMENSION, calibrate, screen_to_grid, grid_to_screen
+from src.infra.frame import Frame
+
+easy_grid = Frame.open("test/infra/easy-grid.png")
+
+real_grid_size = Point(8, 7)
+easy_grid_origin = Point(321, 202)
+
+
+def _lattice_squares(origin: Point) -> list[ScreenSquare]:
+    return [
+        ScreenSquare(origin.x + x * TILE_DIMENSION, origin.y + y * TILE_DIMENSION, TILE_DIMENSION, TILE_DIMENSION)
+        for y in range(real_grid_size.y)
+        for x in range(real_grid_size.x)
+    ]
+
+
+class TestCalibration(TestCase):
+    def test_misdetected_tile_does_not_move_origin(self):
+        misdetected_square = ScreenSquare(easy_grid_origin.x - 30, easy_grid_origin.y - 20, TILE_DIMENSION, TILE_DIMENSION)
+
+        calibration = calibrate([misdetected_square, *_lattice_squares(easy_grid_origin)], real_grid_size, easy_grid)
+
+        self.assertEqual(easy_grid_origin, calibration.origin)
+        self.assertEqual(56, calibration.aligned_tile_quantity)
+
+    def test_screen_to_grid_is_inverse_of_grid_to_screen(self):
+        calibration = calibrate(_lattice_squares(easy_grid_origin), real_grid_size, easy_grid)
+
+        for x in range(real_grid_size.x):
+            for y in range(real_grid_size.y):
+                self.assertEqual(Point(x, y), screen_to_grid(grid_to_screen(Point(x, y), calibration), calibration))
+
+    def test_calibration_holds_on_same_frame(self):
+        calibration = calibrate(_lattice_squares(easy_grid_origin), real_grid_size, easy_grid)
+
+        self.assertTrue(calibration.probes)
+        self.assertTrue(calibration.holds(easy_grid))
+
+    def test_calibration_does_not_hold_when_grid_moved(self):
+        calibration = calibrate(_lattice_squares(easy_grid_origin), real_grid_size, easy_grid)
+        moved_screenshot = Image.new(easy_grid.screenshot.mode, easy_grid.screenshot.size)
+        moved_screenshot.paste(easy_grid.screenshot, (40, 30))
+
+        self.assertFalse(calibration.holds(Frame.of(moved_screenshot)))
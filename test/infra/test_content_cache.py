@@ -0,0 +1,64 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from src.domain.screen import Point
+from src.domain.tile import TileType
+from src.infra.content_cache import ContentCache, content_key
+
+cell = np.arange(86 * 86, dtype=np.uint32).astype(np.uint8).reshape(86, 86)
+other_cell = np.flipud(cell)
+
+
+class TestContentCache(TestCase):
+    def test_same_pixels_have_same_key(self):
+        self.assertEqual(content_key(cell), content_key(cell.copy()))
+        self.assertNotEqual(content_key(cell), content_key(other_cell))
+
+    def test_key_depends_on_salt(self):
+        self.assertNotEqual(content_key(cell, Point(0, 0)), content_key(cell, Point(10, 0)))
+
+    def test_view_has_same_key_as_copy(self):
+        frame = np.zeros((200, 200), np.uint8)
+        frame[10:96, 20:106] = cell
+
+        self.assertEqual(content_key(cell), content_key(frame[10:96, 20:106]))
+
+    def test_least_recently_used_entry_is_dropped_first(self):
+        cache = ContentCache(2)
+        cache.put(b"first", TileType.KEY)
+        cache.put(b"second", TileType.SWORD)
+        cache.get(b"first")
+
+        cache.put(b"third", TileType.WAND)
+
+        self.assertEqual(TileType.KEY, cache.get(b"first"))
+        self.assertIsNone(cache.get(b"second"))
+        self.assertEqual(TileType.WAND, cache.get(b"third"))
+
+    def test_saved_entries_are_loaded(self):
+        cache = ContentCache(10)
+        cache.put(content_key(cell), TileType.KEY)
+        cache.put(content_key(other_cell), TileType.STAR)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache", "cells.json")
+            cache.save(path, lambda tile_type: tile_type.name)
+            loaded_cache = ContentCache(10)
+            loaded_cache.load(path, lambda name: TileType[name])
+
+        self.assertEqual(TileType.KEY, loaded_cache.get(content_key(cell)))
+        self.assertEqual(TileType.STAR, loaded_cache.get(content_key(other_cell)))
+
+    def test_unreadable_entries_are_skipped_when_loaded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cells.json")
+            with open(path, "w") as file:
+                file.write('{"00": "KEY", "01": "REMOVED_TILE"}')
+            cache = ContentCache(10)
+            cache.load(path, lambda name: TileType[name])
+
+        self.assertEqual(TileType.KEY, cache.get(b"\x00"))
+        self.assertIsNone(cache.get(b"\x01"))
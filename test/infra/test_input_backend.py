@@ -0,0 +1,52 @@
+from unittest import TestCase
+
+from src.domain.screen import Point
+from src.infra import input_backend
+from src.infra.input_backend import DragTiming, InputEventType, RecordingInputBackend, is_in_corner, plan_click, plan_drag
+
+timing = DragTiming(press_seconds=0.02, move_seconds={2: 0.2}, steps_per_tile=2, release_seconds=0.03)
+
+
+class TestInputBackend(TestCase):
+    def test_drag_presses_at_start_and_releases_at_end(self):
+        events = plan_drag(Point(100, 50), Point(272, 50), 2, timing)
+
+        self.assertEqual([InputEventType.MOVE, InputEventType.PRESS], [event.type for event in events[:2]])
+        self.assertEqual(Point(100, 50), events[1].position)
+        self.assertEqual(InputEventType.RELEASE, events[-1].type)
+        self.assertEqual(Point(272, 50), events[-1].position)
+
+    def test_drag_moves_in_even_steps(self):
+        events = plan_drag(Point(100, 50), Point(272, 50), 2, timing)
+
+        moves = [event.position for event in events[2:-1]]
+        self.assertEqual([Point(143, 50), Point(186, 50), Point(229, 50), Point(272, 50)], moves)
+
+    def test_drag_takes_only_its_timing(self):
+        backend = RecordingInputBackend()
+
+        backend.send(plan_drag(Point(100, 50), Point(100, 222), 2, timing))
+
+        self.assertAlmostEqual(0.02 + 0.2 + 0.03, backend.elapsed_seconds)
+
+    def test_click_does_not_wait(self):
+        events = plan_click(Point(10, 20))
+
+        self.assertEqual([InputEventType.MOVE, InputEventType.PRESS, InputEventType.RELEASE], [event.type for event in events])
+        self.assertEqual(0, sum(event.delay for event in events))
+
+    def test_send_goes_through_backend(self):
+        backend = RecordingInputBackend()
+        input_backend.set_backend(backend)
+        try:
+            input_backend.send(plan_click(Point(10, 20)))
+        finally:
+            input_backend.set_backend(None)
+
+        self.assertEqual(3, len(backend.events))
+
+    def test_only_screen_corners_trigger_fail_safe(self):
+        screen_size = Point(1920, 1080)
+
+        self.assertTrue(all(is_in_corner(corner, screen_size) for corner in [Point(0, 0), Point(1919, 0), Point(0, 1079), Point(1919, 1079)]))
+        self.assertFalse(any(is_in_corner(point, screen_size) for point in [Point(0, 500), Point(960, 0), Point(1920, 1080)]))
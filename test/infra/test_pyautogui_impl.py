@@ -1,31 +1,26 @@
 from unittest import TestCase
 
-from PIL import Image
-from pyscreeze import Box
-
-from src.domain.screen import Point
+from src.domain.screen import Point, board_point
 from src.domain.tile import TileType
-from src.infra.pyautogui_impl import find_grid
+from src.infra.frame import Frame
+from src.domain.item import ItemType
+from src.infra.pyautogui_impl import find_grid, find_line, find_items, CaptureContext
 
-easy_grid = Image.open("test/infra/easy-grid.png")
-key_in_wrong_column_4_3 = Image.open("test/infra/key-in-wrong-column-4-3.png")
-sword_not_detected_1_6 = Image.open("test/infra/sword-not-detected-1-6.png")
-star_6_0 = Image.open("test/infra/star-6-0.png")
-so_many_errors = Image.open("test/infra/so-many-errors.png")
-while_combo = Image.open("test/infra/while-combo.png")
-after_combo = Image.open("test/infra/after-combo.png")
-two_steps_double_match_combo = Image.open("test/infra/two-steps-double-match-combo.png")
+easy_grid = Frame.open("test/infra/easy-grid.png")
+key_in_wrong_column_4_3 = Frame.open("test/infra/key-in-wrong-column-4-3.png")
+sword_not_detected_1_6 = Frame.open("test/infra/sword-not-detected-1-6.png")
+star_6_0 = Frame.open("test/infra/star-6-0.png")
+so_many_errors = Frame.open("test/infra/so-many-errors.png")
+while_combo = Frame.open("test/infra/while-combo.png")
+after_combo = Frame.open("test/infra/after-combo.png")
+two_steps_double_match_combo = Frame.open("test/infra/two-steps-double-match-combo.png")
 
 real_grid_size = Point(8, 7)
 
 
-def _to_region(image: Image) -> Box:
-    return Box(0, 0, image.size[0], image.size[1])
-
-
 class TestFindGrid(TestCase):
     def test_find_grid(self):
-        grid = find_grid(_to_region(easy_grid), easy_grid)
+        grid = find_grid(easy_grid)
 
         expected_grid = [
             TileType.WAND,
@@ -89,7 +84,7 @@ class TestFindGrid(TestCase):
         self.assertEqual(expected_grid, [tile.type for tile in grid])
 
     def test_star_6_0(self):
-        grid = find_grid(_to_region(star_6_0), star_6_0)
+        grid = find_grid(star_6_0)
 
         expected_grid = [
             TileType.SWORD,
@@ -153,7 +148,7 @@ class TestFindGrid(TestCase):
         self.assertEqual(expected_grid, [tile.type for tile in grid])
 
     def test_key_in_wrong_column_4_3(self):
-        grid = find_grid(_to_region(key_in_wrong_column_4_3), key_in_wrong_column_4_3)
+        grid = find_grid(key_in_wrong_column_4_3)
 
         expected_grid = [
             TileType.LOGS,
@@ -217,7 +212,7 @@ class TestFindGrid(TestCase):
         self.assertEqual(expected_grid, [tile.type for tile in grid])
 
     def test_so_many_errors(self):
-        grid = find_grid(_to_region(so_many_errors), so_many_errors)
+        grid = find_grid(so_many_errors)
 
         expected_grid = [
             TileType.KEY,
@@ -281,7 +276,7 @@ class TestFindGrid(TestCase):
         self.assertEqual(expected_grid, [tile.type for tile in grid])
 
     def test_sword_not_detected_1_6(self):
-        grid = find_grid(_to_region(sword_not_detected_1_6), sword_not_detected_1_6)
+        grid = find_grid(sword_not_detected_1_6)
 
         expected_grid = [
             TileType.WAND,
@@ -345,7 +340,7 @@ class TestFindGrid(TestCase):
         self.assertEqual(expected_grid, [tile.type for tile in grid])
 
     def test_while_combo(self):
-        grid = find_grid(_to_region(while_combo), while_combo)
+        grid = find_grid(while_combo).fill_with_unknown()
 
         expected_grid = [
             TileType.SWORD,
@@ -407,3 +402,30 @@ class TestFindGrid(TestCase):
         ]
 
         self.assertEqual(expected_grid, [tile.type for tile in grid])
+
+
+class TestFindLine(TestCase):
+    def test_find_row(self):
+        context = CaptureContext()
+        find_grid(easy_grid, context)
+
+        line = find_line(easy_grid, [board_point(x, 0) for x in range(8)], context.calibration)
+
+        expected_line = [TileType.WAND, TileType.SWORD, TileType.KEY, TileType.LOGS, TileType.SHIELD, TileType.KEY, TileType.WAND, TileType.KEY]
+        self.assertEqual(expected_line, line)
+
+    def test_find_row_while_combo(self):
+        context = CaptureContext()
+        find_grid(while_combo, context)
+
+        line = find_line(while_combo, [board_point(x, 0) for x in range(8)], context.calibration)
+
+        expected_line = [TileType.SWORD, TileType.KEY, *[TileType.UNKNOWN] * 4, TileType.SWORD, TileType.LOGS]
+        self.assertEqual(expected_line, line)
+
+
+class TestFindItems(TestCase):
+    def test_every_key_is_found(self):
+        items = find_items(while_combo)
+
+        self.assertEqual([ItemType.KEY, ItemType.KEY, ItemType.RED_ORB], sorted((item.type for item in items), key=lambda item_type: item_type.value))
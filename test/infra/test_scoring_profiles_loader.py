@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from src import properties
+from src.domain.objective import ObjectiveType
+from src.domain.scoring_profile import DEFAULT_SCORING_PROFILES
+from src.domain.status import Status
+from src.domain.tile import TileType, TILE_TYPE_INDICES
+from src.infra.scoring_profiles_loader import load_scoring_profiles
+
+KEY_INDEX = TILE_TYPE_INDICES[TileType.KEY]
+SWORD_INDEX = TILE_TYPE_INDICES[TileType.SWORD]
+
+
+class TestLoadScoringProfiles(TestCase):
+    def test_shipped_profiles_keep_default_values(self):
+        scoring_profiles = load_scoring_profiles(properties.SCORING_PROFILES_PATH)
+
+        self.assertEqual(list(DEFAULT_SCORING_PROFILES.find_tile_values(ObjectiveType.GOLEM)), list(scoring_profiles.find_tile_values(ObjectiveType.GOLEM)))
+
+    def test_shipped_profiles_value_keys_less_once_many_are_owned(self):
+        scoring_profiles = load_scoring_profiles(properties.SCORING_PROFILES_PATH)
+
+        few_keys_values = scoring_profiles.find_tile_values(ObjectiveType.CHEST, Status(key_quantity=1))
+        many_keys_values = scoring_profiles.find_tile_values(ObjectiveType.CHEST, Status(key_quantity=6))
+        self.assertLess(many_keys_values[KEY_INDEX], few_keys_values[KEY_INDEX])
+
+    def test_quest_adjusts_default_values(self):
+        with TemporaryDirectory() as folder:
+            path = Path(folder) / "scoring-profiles.json"
+            path.write_text(json.dumps({"quests": {"swords": {"tile_values": {"ZOMBIE": {"SWORD": 5}}}}}))
+
+            scoring_profiles = load_scoring_profiles(path, "swords")
+
+        tile_values = scoring_profiles.find_tile_values(ObjectiveType.ZOMBIE)
+        default_tile_values = DEFAULT_SCORING_PROFILES.find_tile_values(ObjectiveType.ZOMBIE)
+        self.assertEqual(5, tile_values[SWORD_INDEX])
+        self.assertEqual(default_tile_values[KEY_INDEX], tile_values[KEY_INDEX])
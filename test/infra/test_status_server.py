@@ -0,0 +1,30 @@
+import json
+from unittest import TestCase
+
+from src.bot import BotInstance
+from src.infra.status_server import find_properties_error, instances_to_json
+
+
+class TestFindPropertiesError(TestCase):
+    def test_controllable_properties_can_be_set(self):
+        self.assertIsNone(find_properties_error({"MOVEMENT_ENABLED": False, "AUTO_RUN_AGAIN_ENABLED": True}))
+
+    def test_body_must_be_an_object(self):
+        self.assertIsNotNone(find_properties_error(["MOVEMENT_ENABLED"]))
+        self.assertIsNotNone(find_properties_error("MOVEMENT_ENABLED"))
+
+    def test_unknown_property_can_not_be_set(self):
+        self.assertIsNotNone(find_properties_error({"QUEST": "dragon"}))
+
+    def test_value_must_have_the_property_type(self):
+        self.assertIsNotNone(find_properties_error({"MOVEMENT_ENABLED": "no"}))
+
+
+class TestInstancesToJson(TestCase):
+    def test_every_instance_is_listed(self):
+        instances = [BotInstance(), BotInstance()]
+
+        statuses = json.loads(instances_to_json(instances))
+
+        self.assertEqual([None, None], [status["window_handle"] for status in statuses])
+        self.assertTrue(all("game_state" in status["snapshot"] for status in statuses))
@@ -0,0 +1,83 @@
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from src.domain.screen import Point
+from src.infra.frame import Frame
+from src.infra import template_matching
+from src.infra.template_matching import Haystack, PyramidHaystack, TEMPLATE_SPECTRA_CAPACITY
+
+easy_grid = Frame.open("test/infra/easy-grid.png")
+grid_region = easy_grid.region((300, 180, 1200, 800))
+items_region = easy_grid.region((20, 60, 290, 330))
+so_many_errors = Frame.open("test/infra/so-many-errors.png")
+so_many_errors_items_region = so_many_errors.region((20, 60, 290, 330))
+so_many_errors_objectives_region = so_many_errors.region((300, 50, 1200, 190))
+
+tile_assets = ["assets/tiles/key.png", "assets/tiles/logs.png", "assets/tiles/star.png"]
+item_assets = ["assets/items/key.png", "assets/items/log-to-key-scroll.png", "assets/items/bread.png", "assets/items/red-orb.png"]
+objective_assets = ["assets/objectives/skeleton-archer.png", "assets/objectives/skeleton.png", "assets/objectives/golem2.png"]
+
+
+class TestHaystack(TestCase):
+    def test_scores_are_same_as_opencv(self):
+        haystack = Haystack(items_region)
+
+        for asset in item_assets:
+            template = cv2.imread(asset, cv2.IMREAD_GRAYSCALE)
+            expected_scores = cv2.matchTemplate(items_region, template, cv2.TM_CCOEFF_NORMED)
+
+            np.testing.assert_allclose(haystack.match(asset, template), expected_scores, atol=1e-3)
+
+    def test_locate_all_finds_same_matches_as_opencv_in_row_major_order(self):
+        haystack = Haystack(grid_region)
+
+        for asset in tile_assets:
+            template = cv2.imread(asset, cv2.IMREAD_GRAYSCALE)
+            ys, xs = np.nonzero(cv2.matchTemplate(grid_region, template, cv2.TM_CCOEFF_NORMED) > 0.999)
+
+            self.assertEqual([Point(int(x), int(y)) for x, y in zip(xs, ys)], haystack.locate_all(asset, template))
+
+    def test_flat_template_matches_everywhere(self):
+        haystack = Haystack(np.arange(16, dtype=np.uint8).reshape(4, 4))
+
+        self.assertEqual(Point(0, 0), haystack.locate("flat", np.full((2, 2), 7, np.uint8)))
+
+    def test_template_larger_than_haystack_is_not_found(self):
+        haystack = Haystack(np.arange(16, dtype=np.uint8).reshape(4, 4))
+
+        self.assertIsNone(haystack.locate("large", np.arange(25, dtype=np.uint8).reshape(5, 5)))
+
+    def test_template_spectra_are_bounded(self):
+        haystack = Haystack(np.arange(16, dtype=np.uint8).reshape(4, 4))
+
+        for i in range(TEMPLATE_SPECTRA_CAPACITY + 10):
+            haystack.match(("bounded", i), np.array([[0, i % 200 + 1]], np.uint8))
+
+        self.assertEqual(TEMPLATE_SPECTRA_CAPACITY, len(template_matching._template_spectra))
+
+
+class TestPyramidHaystack(TestCase):
+    def test_locate_all_finds_same_matches_as_full_search(self):
+        for region, assets, confidence in ((so_many_errors_items_region, item_assets, 0.999), (so_many_errors_objectives_region, objective_assets, 0.85)):
+            haystack = Haystack(region)
+            pyramid_haystack = PyramidHaystack(region)
+
+            for asset in assets:
+                template = cv2.imread(asset, cv2.IMREAD_GRAYSCALE)
+
+                self.assertEqual(haystack.locate_all(asset, template, confidence), pyramid_haystack.locate_all(asset, template, confidence))
+
+    def test_best_coarse_position_is_confirmed_when_no_candidate_is_confident_enough(self):
+        template = cv2.imread("assets/objectives/skeleton-archer.png", cv2.IMREAD_GRAYSCALE)
+        expected_matches = Haystack(so_many_errors_objectives_region).locate_all("skeleton-archer", template, 0.85)
+
+        coarse_confidence_ratio = template_matching.COARSE_CONFIDENCE_RATIO
+        template_matching.COARSE_CONFIDENCE_RATIO = 1.1
+        try:
+            match = PyramidHaystack(so_many_errors_objectives_region).locate("skeleton-archer", template, 0.85)
+        finally:
+            template_matching.COARSE_CONFIDENCE_RATIO = coarse_confidence_ratio
+
+        self.assertIn(match, expected_matches)